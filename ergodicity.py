@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Simulate many multiplicative wealth paths and compare time and ensemble averages.
+
+Usage: python ergodicity.py [--game original|modified] [--paths N] [--years Y] [--threshold X ...]
+
+Covers the ergodicity economics exercises in
+topics/GenerativeModelsAndSimulation: every year a coin flip multiplies the
+account balance by one of a few factors (x1.5 or x0.6 in the original game,
+x1.25 or x0.8 when only half the balance is bet). Paths are simulated in log
+space, where the product of factors is a cumulative sum, in chunks spread
+over a process pool (see simulation.py). No path is kept: each chunk only
+counts how many paths sit at each attainable balance after each step, and
+those counts give exact per-step summaries (ensemble mean, median, time-
+average growth rate and P(balance > threshold)) for millions of paths.
+
+From Python:
+
+    from ergodicity import GAMES, simulate_wealth_paths
+    result = simulate_wealth_paths(10**7, steps=35, thresholds=[1000, 10000], seed=55,
+                                   **GAMES['original'])
+    result['median']            # median balance after each year
+    result['p_above'][1000]     # P(balance > $1,000) after each year
+"""
+
+import time
+import argparse
+from collections import Counter
+import numpy as np
+
+from simulation import map_chunks, split_into_chunks
+
+# Path-steps simulated per chunk; at about 24 bytes per path-step this keeps
+# each worker near 100 MB
+CHUNK_PATH_STEPS = 4_000_000
+# Dense per-step counting is used while steps x attainable balances stays below this
+MAX_DENSE_BINS = 10_000_000
+
+# Balance multipliers and their probabilities for the course's coin-flip games
+GAMES = {
+    # Heads: balance +50%, tails: balance -40%
+    'original': {'factors': (1.5, 0.6), 'probabilities': (0.5, 0.5)},
+    # Half the balance is bet: heads +50% of the bet, tails -40% of the bet
+    'modified': {'factors': (1.25, 0.8), 'probabilities': (0.5, 0.5)},
+}
+
+def simulate_chunk(task):
+    """
+    Simulate one chunk of paths and count the paths at each balance per step.
+
+    Positions are lattice coordinates in log space: with outcome counts
+    c_0..c_{m-1} after t steps, log(balance) = log(initial) + sum(c_j *
+    log(factor_j)), and c_0..c_{m-2} are packed into one integer key in base
+    steps + 1, so a cumulative sum of per-step increments tracks every path
+    exactly.
+
+    Args:
+        task: (SeedSequence, paths, steps, probabilities) tuple
+
+    Returns:
+        List with one Counter (key -> paths) per step
+    """
+    seed_sequence, paths, steps, probabilities = task
+    rng = np.random.default_rng(seed_sequence)
+    outcomes = len(probabilities)
+    weights = np.array([(steps + 1) ** j for j in range(outcomes - 1)] + [0], dtype=np.int64)
+
+    if outcomes == 2:
+        flips = (rng.random((paths, steps)) >= probabilities[0]).astype(np.intp)
+    else:
+        flips = rng.choice(outcomes, size=(paths, steps), p=probabilities)
+    keys = np.cumsum(weights[flips], axis=1)
+    del flips
+
+    span = (steps + 1) ** (outcomes - 1)
+    counts = []
+    if span * steps <= MAX_DENSE_BINS:
+        # One bincount over every step: offset each step's keys into its own block
+        dense = np.bincount((keys + np.arange(steps, dtype=np.int64) * span).ravel(),
+                            minlength=span * steps).reshape(steps, span)
+        for row in dense:
+            nonzero = np.flatnonzero(row)
+            counts.append(Counter(dict(zip(nonzero.tolist(), row[nonzero].tolist()))))
+    else:
+        for step in range(steps):
+            values, step_counts = np.unique(keys[:, step], return_counts=True)
+            counts.append(Counter(dict(zip(values.tolist(), step_counts.tolist()))))
+    return counts
+
+def merge_counts(partials):
+    """Add up per-step Counters from chunks."""
+    total = None
+    for part in partials:
+        if total is None:
+            total = part
+            continue
+        for step_total, step_counts in zip(total, part):
+            step_total.update(step_counts)
+    return total
+
+def weighted_quantile(values, weights, q):
+    """
+    Return the q-quantile of values repeated weights times.
+
+    Args:
+        values: Sorted array of values
+        weights: Number of paths at each value
+        q: Quantile between 0 and 1
+
+    Returns:
+        The quantile, interpolating linearly between neighbouring paths as
+        numpy.quantile does
+    """
+    position = q * (weights.sum() - 1)
+    cumulative = np.cumsum(weights)
+    lower = values[np.searchsorted(cumulative, np.floor(position), side='right')]
+    upper = values[np.searchsorted(cumulative, np.ceil(position), side='right')]
+    return lower + (upper - lower) * (position - np.floor(position))
+
+def summarize_paths(counts, steps, factors, initial, thresholds):
+    """
+    Compute per-step statistics from the path counts.
+
+    Args:
+        counts: Per-step Counters of lattice key -> paths
+        steps: Number of steps
+        factors: Balance multiplier of each outcome
+        initial: Starting balance
+        thresholds: Balances for which P(balance > threshold) is reported
+
+    Returns:
+        Dictionary of per-step arrays (index 0 is the start) and the final
+        balance distribution; see simulate_wealth_paths()
+    """
+    log_factors = np.log(np.asarray(factors, dtype=np.float64))
+    base = steps + 1
+    result = {
+        'mean': np.empty(steps + 1),
+        'median': np.empty(steps + 1),
+        'time_average_growth': np.zeros(steps + 1),
+        'ensemble_growth': np.zeros(steps + 1),
+        'p_above': {threshold: np.empty(steps + 1) for threshold in thresholds},
+    }
+    result['mean'][0] = result['median'][0] = initial
+    for threshold in thresholds:
+        result['p_above'][threshold][0] = float(initial > threshold)
+
+    for step, step_counts in enumerate(counts, start=1):
+        keys = np.fromiter(step_counts.keys(), dtype=np.int64, count=len(step_counts))
+        paths = np.fromiter(step_counts.values(), dtype=np.int64, count=len(step_counts))
+        # Unpack outcome counts from the keys; the last outcome takes the remaining steps
+        outcome_counts = np.empty((len(keys), len(factors)), dtype=np.int64)
+        remainder = keys
+        for j in range(len(factors) - 1):
+            remainder, outcome_counts[:, j] = np.divmod(remainder, base)
+        outcome_counts[:, -1] = step - outcome_counts[:, :-1].sum(axis=1)
+        log_growth = outcome_counts @ log_factors
+
+        order = np.argsort(log_growth)
+        log_growth, paths = log_growth[order], paths[order]
+        balances = initial * np.exp(log_growth)
+        total = paths.sum()
+
+        result['mean'][step] = (paths * balances).sum() / total
+        result['median'][step] = weighted_quantile(balances, paths, 0.5)
+        result['time_average_growth'][step] = (paths * log_growth).sum() / total / step
+        result['ensemble_growth'][step] = np.log(result['mean'][step] / initial) / step
+        for threshold in thresholds:
+            result['p_above'][threshold][step] = paths[balances > threshold].sum() / total
+        if step == steps:
+            result['final'] = dict(zip(balances.tolist(), (paths / total).tolist()))
+    if steps == 0:
+        result['final'] = {float(initial): 1.0}
+    return result
+
+def simulate_wealth_paths(paths, steps, factors, probabilities, initial=1000.0, thresholds=(),
+                          seed=None, workers=None, chunk_paths=None):
+    """
+    Simulate multiplicative wealth paths and summarize them step by step.
+
+    Args:
+        paths: Number of paths
+        steps: Number of steps (e.g. years until age 55)
+        factors: Balance multiplier of each outcome (e.g. (1.5, 0.6))
+        probabilities: Probability of each outcome
+        initial: Starting balance
+        thresholds: Balances for which P(balance > threshold) is reported
+        seed: Root seed; results are reproducible for any number of workers
+        workers: Worker processes (default: one per CPU; 1 runs in this process)
+        chunk_paths: Paths per chunk (default: CHUNK_PATH_STEPS / steps)
+
+    Returns:
+        Dictionary with per-step arrays of length steps + 1 (index 0 is the
+        start): 'mean' (ensemble average), 'median', 'time_average_growth'
+        (average log growth per step along a path), 'ensemble_growth' (log
+        growth per step of the ensemble mean), 'expected' (exact expected
+        balance) and 'p_above' (threshold -> probability array); plus 'final'
+        (balance -> probability at the last step), 'paths', 'seconds' and 'seed'
+
+    Raises:
+        ValueError: If there are no paths, or factors and probabilities do
+            not match or are invalid
+    """
+    factors = tuple(float(factor) for factor in factors)
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    if paths < 1 or steps < 0:
+        raise ValueError("Need at least one path and a non-negative number of steps")
+    if len(factors) != len(probabilities) or len(factors) < 2:
+        raise ValueError("Need at least two factors, each with a probability")
+    if min(factors) <= 0 or not np.isclose(probabilities.sum(), 1.0) or probabilities.min() < 0:
+        raise ValueError("Factors must be positive and probabilities must sum to 1")
+    if (steps + 1) ** (len(factors) - 1) >= 2 ** 62:
+        raise ValueError("Too many steps for this many outcomes")
+
+    chunk_paths = chunk_paths or max(1, CHUNK_PATH_STEPS // max(steps, 1))
+    seed_sequence, chunks = split_into_chunks(paths, chunk_paths, seed)
+    tasks = [(chunk_seed, size, steps, probabilities) for chunk_seed, size in chunks]
+
+    start = time.perf_counter()
+    counts = map_chunks(simulate_chunk, tasks, workers, merge_counts) if steps else []
+    result = summarize_paths(counts, steps, factors, initial, thresholds)
+    result['expected'] = initial * float(np.dot(factors, probabilities)) ** np.arange(steps + 1)
+    result['paths'] = paths
+    result['seconds'] = time.perf_counter() - start
+    result['seed'] = seed_sequence.entropy
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the coin-flip account balance game.")
+    parser.add_argument('--game', choices=sorted(GAMES), default='original',
+                        help="which version of the game to play (default: original)")
+    parser.add_argument('--paths', type=int, default=10**6,
+                        help="number of simulated lives (default: 1,000,000)")
+    parser.add_argument('--years', type=int, default=35,
+                        help="coin flips, one per year until age 55 (default: 35)")
+    parser.add_argument('--initial', type=float, default=1000.0,
+                        help="starting balance (default: 1000)")
+    parser.add_argument('--threshold', type=float, action='append',
+                        help="report P(balance > THRESHOLD); repeatable (default: 1000 and 10000)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument('--seed', type=int, default=55,
+                        help="random seed (default: 55)")
+    args = parser.parse_args()
+    if args.paths < 1 or args.years < 1:
+        print("✗ --paths and --years must be at least 1")
+        return 1
+
+    thresholds = args.threshold or [1000.0, 10000.0]
+    result = simulate_wealth_paths(args.paths, args.years, initial=args.initial, thresholds=thresholds,
+                                   seed=args.seed, workers=args.workers, **GAMES[args.game])
+
+    print(f"Simulated {result['paths']:,} paths of {args.years} years in {result['seconds']:.2f}s "
+          f"(seed {result['seed']})")
+    header = f"{'Year':>4} {'Expected':>12} {'Mean':>12} {'Median':>12} {'Time avg':>9}"
+    header += ''.join(f" {'P(>' + format(threshold, 'g') + ')':>10}" for threshold in thresholds)
+    print(header)
+    for step in sorted(set(range(0, args.years + 1, 5)) | {args.years}):
+        growth = np.expm1(result['time_average_growth'][step]) * 100
+        line = (f"{step:>4} {result['expected'][step]:>12,.2f} {result['mean'][step]:>12,.2f} "
+                f"{result['median'][step]:>12,.2f} {growth:>8.2f}%")
+        line += ''.join(f" {result['p_above'][threshold][step]:>10.4f}" for threshold in thresholds)
+        print(line)
+    print("Time avg is the typical path's growth per year; compare it with the "
+          f"ensemble's {np.expm1(result['ensemble_growth'][args.years]) * 100:.2f}%.")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
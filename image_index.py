@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Find duplicate and near-duplicate images across the student portfolios.
+
+Usage: python image_index.py [PATH ...] [--threshold BITS] [--workers N] [--json FILE]
+
+Every image under the given files or directories (default:
+student-portfolios) gets a SHA-256 of its bytes and a 64-bit perceptual
+hash (dHash) computed from a reduced-size decode, so a multi-MB JPEG is
+decoded at a fraction of its resolution. Images are hashed in parallel and
+the results kept in .image_index.json; on later runs only files whose size
+or modification time changed are hashed again.
+
+The report lists clusters of exact copies (same bytes) and of near
+duplicates (perceptual hashes at most --threshold bits apart: re-encodes,
+resized copies next to their originals, re-exported screenshots), with the
+bytes that could be reclaimed by keeping only the smallest file of each
+cluster. Resize outputs (<name>_resized.<ext>) are indexed too.
+"""
+
+from PIL import Image, ImageOps
+import os
+import json
+import time
+import argparse
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from resize_images import IMAGE_EXTENSIONS, hash_file
+
+INDEX_FILENAME = '.image_index.json'
+# Bump when the way hashes are computed changes
+INDEX_VERSION = 1
+INDEXED_EXTENSIONS = IMAGE_EXTENSIONS + ('.gif', '.avif')
+# Perceptual hashes at most this many bits apart count as near duplicates
+DEFAULT_THRESHOLD = 6
+# dHash compares neighbouring pixels of a (HASH_SIZE + 1) x HASH_SIZE grayscale image
+HASH_SIZE = 8
+# Set bits in every byte value, for Hamming distances between hashes
+POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+def find_index_images(paths):
+    """
+    Find every image among files and directories, including resize outputs.
+
+    Args:
+        paths: Files or directories to search
+
+    Returns:
+        Sorted list of image paths; hidden files and directories are skipped
+    """
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            found.extend(os.path.join(root, name) for name in files
+                         if not name.startswith('.') and name.lower().endswith(INDEXED_EXTENSIONS))
+    return sorted(found)
+
+def perceptual_hash(img):
+    """
+    Compute the 64-bit difference hash (dHash) of an image.
+
+    Args:
+        img: Open PIL image; JPEGs are decoded at reduced size via draft()
+
+    Returns:
+        The hash as a 16-digit hex string
+    """
+    # Let the JPEG decoder scale down by up to 8x while decoding
+    img.draft('L', (HASH_SIZE * 8, HASH_SIZE * 8))
+    img = ImageOps.exif_transpose(img)
+    if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+        # Judge transparent images as they look on a white page
+        rgba = img.convert('RGBA')
+        background = Image.new('RGBA', rgba.size, (255, 255, 255, 255))
+        img = Image.alpha_composite(background, rgba)
+    small = img.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BOX,
+                                    reducing_gap=2.0)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    return f"{int(np.packbits(bits).view('>u8')[0]):016x}"
+
+def index_image(path):
+    """
+    Hash one image.
+
+    Args:
+        path: Path to the image
+
+    Returns:
+        Tuple of (path, index entry), with None for the entry if the file
+        cannot be read; the perceptual hash is None if Pillow cannot decode it
+    """
+    try:
+        stat = os.stat(path)
+        entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': hash_file(path),
+                 'dhash': None, 'width': None, 'height': None}
+    except OSError as e:
+        print(f"✗ Error reading {path}: {e}")
+        return path, None
+    try:
+        with Image.open(path) as img:
+            entry['width'], entry['height'] = img.size
+            entry['dhash'] = perceptual_hash(img)
+    except Exception as e:
+        print(f"Warning: Could not decode {path}: {e}")
+    return path, entry
+
+def load_index(index_path):
+    """Load the image index, returning an empty one if it is missing, unreadable or outdated."""
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warning: Ignoring unreadable index {index_path}: {e}")
+        return {}
+    if index.get('version') != INDEX_VERSION:
+        return {}
+    return index.get('images', {})
+
+def save_index(index_path, images):
+    """Write the image index."""
+    try:
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'images': images}, f, indent=1, sort_keys=True)
+    except OSError as e:
+        print(f"Warning: Could not write index {index_path}: {e}")
+
+def update_index(paths, index_path=INDEX_FILENAME, workers=None, force=False):
+    """
+    Bring the index up to date for the given images, hashing only changed files.
+
+    Args:
+        paths: Image paths to index
+        index_path: Path of the on-disk index, or None to keep it in memory only
+        workers: Number of worker processes (default: one per CPU)
+        force: Re-hash every image
+
+    Returns:
+        Tuple of (entries for the given paths keyed by path, number of images hashed)
+    """
+    cached = {} if force or not index_path else load_index(index_path)
+    images = {}
+    stale = []
+    for path in paths:
+        entry = cached.get(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            images[path] = entry
+        else:
+            stale.append(path)
+
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            chunksize = max(1, len(stale) // ((workers or os.cpu_count()) * 4))
+            for path, entry in executor.map(index_image, stale, chunksize=chunksize):
+                if entry is not None:
+                    images[path] = entry
+
+    if index_path:
+        # Keep entries for images outside this run's paths; drop deleted files
+        merged = {path: entry for path, entry in cached.items() if os.path.exists(path)}
+        merged.update(images)
+        save_index(index_path, merged)
+    return images, len(stale)
+
+def hamming_pairs(hashes, threshold):
+    """
+    Find pairs of perceptual hashes at most threshold bits apart.
+
+    Args:
+        hashes: Array of 64-bit hashes (uint64)
+        threshold: Largest Hamming distance counted as a match
+
+    Returns:
+        Iterator of (i, j) index pairs with i < j
+    """
+    as_bytes = hashes.view(np.uint8).reshape(-1, 8)
+    for i in range(len(hashes) - 1):
+        distances = POPCOUNT[as_bytes[i + 1:] ^ as_bytes[i]].sum(axis=1)
+        for offset in np.flatnonzero(distances <= threshold):
+            yield i, i + 1 + int(offset)
+
+def find_clusters(images, threshold=DEFAULT_THRESHOLD):
+    """
+    Group the indexed images into exact and near-duplicate clusters.
+
+    Args:
+        images: Index entries keyed by path
+        threshold: Largest perceptual hash distance for near duplicates
+
+    Returns:
+        Dictionary with 'exact' and 'near' lists of clusters, each cluster a
+        dictionary with 'paths' (smallest file first), 'bytes' (total size)
+        and 'reclaimable' (bytes freed by keeping only the first path);
+        near clusters also hold 'distance' (largest distance to the kept image)
+    """
+    by_content = defaultdict(list)
+    for path, entry in images.items():
+        by_content[entry['sha256']].append(path)
+
+    def make_cluster(paths):
+        paths = sorted(paths, key=lambda path: (images[path]['size'], len(path), path))
+        total = sum(images[path]['size'] for path in paths)
+        return {'paths': paths, 'bytes': total, 'reclaimable': total - images[paths[0]]['size']}
+
+    exact = [make_cluster(paths) for paths in by_content.values() if len(paths) > 1]
+
+    # Near duplicates: union-find over one representative per distinct content
+    representatives = sorted(paths[0] for paths in by_content.values() if images[paths[0]]['dhash'])
+    hashes = np.array([int(images[path]['dhash'], 16) for path in representatives], dtype=np.uint64)
+    parent = list(range(len(representatives)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in hamming_pairs(hashes, threshold):
+        parent[find(i)] = find(j)
+
+    groups = defaultdict(list)
+    for i, path in enumerate(representatives):
+        groups[find(i)].append(path)
+    near = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        paths = [path for member in members for path in by_content[images[member]['sha256']]]
+        cluster = make_cluster(paths)
+        kept = int(images[cluster['paths'][0]]['dhash'], 16)
+        cluster['distance'] = max(bin(kept ^ int(images[path]['dhash'], 16)).count('1')
+                                  for path in cluster['paths'])
+        near.append(cluster)
+
+    exact.sort(key=lambda cluster: -cluster['reclaimable'])
+    near.sort(key=lambda cluster: -cluster['reclaimable'])
+    return {'exact': exact, 'near': near}
+
+def print_clusters(title, clusters, images):
+    """Print one kind of cluster, largest savings first."""
+    if not clusters:
+        return
+    print(f"\n{title}:")
+    for cluster in clusters:
+        extra = f", up to {cluster['distance']} bits apart" if 'distance' in cluster else ''
+        print(f"  {cluster['reclaimable'] / (1024*1024):.2f} MB reclaimable ({len(cluster['paths'])} files{extra})")
+        for i, path in enumerate(cluster['paths']):
+            entry = images[path]
+            marker = 'keep' if i == 0 else '    '
+            size = f"{entry['width']}x{entry['height']}" if entry['width'] else '?'
+            print(f"    {marker} {path} ({entry['size'] / 1024:.0f} KB, {size})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Find duplicate and near-duplicate images.")
+    parser.add_argument('paths', nargs='*', default=['student-portfolios'],
+                        help="files or directories to search (default: student-portfolios)")
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD,
+                        help=f"largest perceptual hash distance in bits for near duplicates "
+                             f"(default: {DEFAULT_THRESHOLD}, 0-64)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="number of parallel workers (default: one per CPU)")
+    parser.add_argument('--index', default=INDEX_FILENAME,
+                        help=f"index file (default: {INDEX_FILENAME})")
+    parser.add_argument('--no-index', action='store_true',
+                        help="do not read or write the index file")
+    parser.add_argument('--force', action='store_true',
+                        help="re-hash every image even if it is unchanged")
+    parser.add_argument('--json', metavar='FILE',
+                        help="also save the clusters as JSON")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        if not os.path.exists(path):
+            print(f"✗ Not found: {path}")
+    images_found = find_index_images([p for p in args.paths if os.path.exists(p)])
+    if not images_found:
+        print("No images found.")
+        return 0
+
+    start = time.perf_counter()
+    images, hashed = update_index(images_found, None if args.no_index else args.index,
+                                  args.workers, args.force)
+    clusters = find_clusters(images, args.threshold)
+    print(f"Indexed {len(images)} images ({hashed} hashed, {len(images) - hashed} unchanged) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    print_clusters("Exact duplicates", clusters['exact'], images)
+    print_clusters("Near duplicates", clusters['near'], images)
+    # Exact copies inside a near-duplicate cluster are already counted there
+    in_near = {path for cluster in clusters['near'] for path in cluster['paths']}
+    total = (sum(cluster['reclaimable'] for cluster in clusters['near'])
+             + sum(cluster['reclaimable'] for cluster in clusters['exact'] if cluster['paths'][0] not in in_near))
+    print(f"\n{len(clusters['exact'])} exact and {len(clusters['near'])} near-duplicate clusters, "
+          f"{total / (1024*1024):.2f} MB reclaimable in total")
+
+    if args.json:
+        try:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(clusters, f, indent=2)
+            print(f"Clusters saved to {args.json}")
+        except OSError as e:
+            print(f"Warning: Could not save {args.json}: {e}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
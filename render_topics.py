@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Render the course's Quarto documents in parallel, skipping unchanged ones.
+
+Usage: python render_topics.py [PATH ...] [--jobs N] [--force] [--dry-run] [-- QUARTO_ARGS]
+
+Every .qmd file under the given files or directories (default: topics) is
+rendered with `quarto render`. A document is skipped when its inputs hash
+to the same value as at its last successful render and its outputs are
+still there. The inputs are the .qmd source (prose and code chunks), the
+local files it references (data files, images, includes, including
+datasets/ files it downloads from this repository's raw GitHub URL), any
+_quarto.yml/_metadata.yml above it, the Quarto version and the render
+arguments. Hashes are kept in .render_cache.json. A document that reads
+any other URL (another repository's data, say) cannot be checked for
+changes locally and is rendered every time.
+
+Documents in different directories render concurrently, one quarto process
+each; documents that share a directory render one after another, since
+Quarto keeps per-directory scratch files.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILENAME = '.render_cache.json'
+# Bump when the inputs that go into a document's hash change
+RENDER_CACHE_VERSION = 1
+OUTPUT_EXTENSIONS = ('.html', '.pdf', '.docx', '.pptx', '.md', '.ipynb')
+PROJECT_FILES = ('_quarto.yml', '_quarto.yaml', '_metadata.yml', '_metadata.yaml')
+
+# Quoted paths, markdown links and include shortcodes that may name an input
+REFERENCE_PATTERN = re.compile(
+    r'''["']([^"'\s]+\.[A-Za-z0-9]{1,8})["']'''
+    r'|\]\(([^)\s]+)'
+    r'|\{\{<\s*include\s+([^\s>]+)')
+# owner/name of this repository on GitHub
+REPOSITORY = 'flyaflya/decAnalytics'
+# raw.githubusercontent.com URLs of this repository map onto local files;
+# raw URLs of other repositories are remote inputs like any other URL
+RAW_GITHUB_PATTERN = re.compile(
+    r'^https://raw\.githubusercontent\.com/' + re.escape(REPOSITORY) + r'/(?:refs/heads/)?[^/]+/(.+)$',
+    re.IGNORECASE)
+
+def find_documents(paths):
+    """
+    Find the Quarto documents among files and directories.
+
+    Args:
+        paths: Files or directories to search
+
+    Returns:
+        Sorted list of .qmd paths; hidden directories and files starting
+        with an underscore (Quarto partials) are skipped
+    """
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [d for d in dirs if not d.startswith('.') and not d.endswith('_files')]
+            found.extend(os.path.join(root, name) for name in files
+                         if name.endswith('.qmd') and not name.startswith('_'))
+    return sorted(found)
+
+def hash_file(path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def referenced_files(doc_path, content):
+    """
+    Find the local files a document reads or embeds.
+
+    Args:
+        doc_path: Path to the .qmd file
+        content: The document's source
+
+    Returns:
+        Tuple of (files, urls): sorted existing file paths (relative to the
+        repository root) and sorted remote URLs the document's code reads
+    """
+    doc_dir = os.path.dirname(os.path.abspath(doc_path))
+    found = set()
+    urls = set()
+    for match in REFERENCE_PATTERN.finditer(content):
+        reference = next(group for group in match.groups() if group)
+        raw = RAW_GITHUB_PATTERN.match(reference)
+        if raw:
+            candidate = os.path.join(REPO_ROOT, raw.group(1))
+        elif '://' in reference or reference.startswith(('#', 'mailto:')):
+            # Quoted URLs are read by code (read.csv("https://...")); links are not inputs
+            if match.group(1) and reference.startswith(('http://', 'https://')):
+                urls.add(reference)
+            continue
+        else:
+            candidate = os.path.join(doc_dir, reference.split('#')[0])
+        candidate = os.path.normpath(candidate)
+        if candidate != os.path.abspath(doc_path) and os.path.isfile(candidate):
+            found.add(os.path.relpath(candidate, REPO_ROOT))
+
+    # Project and directory metadata also change the output
+    directory = doc_dir
+    while True:
+        for name in PROJECT_FILES:
+            candidate = os.path.join(directory, name)
+            if os.path.isfile(candidate):
+                found.add(os.path.relpath(candidate, REPO_ROOT))
+        if directory == REPO_ROOT or os.path.dirname(directory) == directory:
+            break
+        directory = os.path.dirname(directory)
+    return sorted(found), sorted(urls)
+
+def document_hash(doc_path, quarto_version, render_args, file_hashes):
+    """
+    Hash everything that determines a document's rendered output.
+
+    Args:
+        doc_path: Path to the .qmd file
+        quarto_version: Output of `quarto --version`
+        render_args: Extra arguments passed to `quarto render`
+        file_hashes: Cache of file path -> content hash shared between documents
+
+    Returns:
+        Tuple of (hex digest, list of input files, list of remote URLs read);
+        the digest does not cover the remote URLs' contents
+    """
+    with open(doc_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    inputs, urls = referenced_files(doc_path, content)
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps([RENDER_CACHE_VERSION, quarto_version, render_args]).encode('utf-8'))
+    digest.update(content.encode('utf-8'))
+    for path in inputs:
+        if path not in file_hashes:
+            file_hashes[path] = hash_file(os.path.join(REPO_ROOT, path))
+        digest.update(f"\0{path}\0{file_hashes[path]}".encode('utf-8'))
+    return digest.hexdigest(), inputs, urls
+
+def document_outputs(doc_path, since=None):
+    """
+    Return the rendered files of a document (<name>.html, <name>.pdf, ...).
+
+    Args:
+        doc_path: Path to the .qmd file
+        since: Only count files modified at or after this time (seconds)
+    """
+    stem = os.path.splitext(doc_path)[0]
+    outputs = []
+    for extension in OUTPUT_EXTENSIONS:
+        path = stem + extension
+        if os.path.isfile(path) and (since is None or os.path.getmtime(path) >= since):
+            outputs.append(os.path.relpath(path, REPO_ROOT))
+    return outputs
+
+def load_cache(cache_path):
+    """Load the render cache, returning an empty cache if it is missing or unreadable."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warning: Ignoring unreadable cache {cache_path}: {e}")
+        return {}
+
+def save_cache(cache_path, cache):
+    """Write the render cache."""
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+    except OSError as e:
+        print(f"Warning: Could not write cache {cache_path}: {e}")
+
+def quarto_version(quarto):
+    """Return the Quarto version string, or None if Quarto cannot be run."""
+    try:
+        result = subprocess.run([quarto, '--version'], capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+def render_document(quarto, doc_path, render_args):
+    """
+    Render one document with Quarto.
+
+    Args:
+        quarto: Quarto executable
+        doc_path: Path to the .qmd file
+        render_args: Extra arguments passed to `quarto render`
+
+    Returns:
+        Tuple of (success, elapsed seconds, output files, error output)
+    """
+    start = time.time()
+    result = subprocess.run([quarto, 'render', os.path.basename(doc_path)] + render_args,
+                            cwd=os.path.dirname(os.path.abspath(doc_path)),
+                            capture_output=True, text=True)
+    elapsed = time.time() - start
+    if result.returncode != 0:
+        return False, elapsed, [], result.stderr
+    # Filesystem timestamps can be coarser than time.time()
+    return True, elapsed, document_outputs(doc_path, since=int(start) - 1), ''
+
+def render_directory(quarto, docs, render_args):
+    """Render the documents of one directory in order; returns (doc, result) pairs."""
+    return [(doc, render_document(quarto, doc, render_args)) for doc in docs]
+
+def render_documents(docs, quarto='quarto', jobs=None, force=False, dry_run=False,
+                     render_args=None, cache_path=None):
+    """
+    Render the documents whose inputs changed, directories in parallel.
+
+    Args:
+        docs: Paths to .qmd files
+        quarto: Quarto executable
+        jobs: Directories rendered at the same time (default: one per CPU)
+        force: Render every document even if it is up to date
+        dry_run: Only report which documents would be rendered
+        render_args: Extra arguments passed to `quarto render`
+        cache_path: Path of the render cache (default: .render_cache.json
+            in the repository root)
+
+    Returns:
+        Dictionary with lists of 'rendered', 'skipped' and 'failed' documents
+    """
+    render_args = render_args or []
+    cache_path = cache_path or os.path.join(REPO_ROOT, CACHE_FILENAME)
+    summary = {'rendered': [], 'skipped': [], 'failed': []}
+
+    version = quarto_version(quarto)
+    if version is None and not dry_run:
+        print(f"✗ Could not run {quarto}; install Quarto from https://quarto.org")
+        summary['failed'] = list(docs)
+        return summary
+
+    cache = load_cache(cache_path)
+    file_hashes = {}
+    pending = {}
+    hashes = {}
+    for doc in docs:
+        key = os.path.relpath(os.path.abspath(doc), REPO_ROOT)
+        digest, inputs, urls = document_hash(doc, version, render_args, file_hashes)
+        entry = cache.get(key, {})
+        outputs_present = entry.get('outputs') and all(
+            os.path.isfile(os.path.join(REPO_ROOT, path)) for path in entry['outputs'])
+        # Remote inputs may have changed without any local trace
+        if not force and not urls and entry.get('hash') == digest and outputs_present:
+            summary['skipped'].append(doc)
+            continue
+        hashes[doc] = key, digest, inputs + urls
+        pending.setdefault(os.path.dirname(os.path.abspath(doc)), []).append(doc)
+
+    if dry_run:
+        for directory_docs in pending.values():
+            for doc in directory_docs:
+                print(f"• Would render {hashes[doc][0]} (inputs: {', '.join(hashes[doc][2]) or 'none'})")
+                summary['rendered'].append(doc)
+        return summary
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        futures = [executor.submit(render_directory, quarto, directory_docs, render_args)
+                   for directory_docs in pending.values()]
+        for future in as_completed(futures):
+            for doc, (success, elapsed, outputs, error) in future.result():
+                key, digest, inputs = hashes[doc]
+                if not success:
+                    print(f"✗ {key} failed after {elapsed:.1f}s")
+                    for line in error.strip().splitlines()[-10:]:
+                        print(f"    {line}")
+                    summary['failed'].append(doc)
+                    continue
+                print(f"✓ {key} rendered in {elapsed:.1f}s → {', '.join(outputs) or 'no outputs found'}")
+                cache[key] = {'hash': digest, 'inputs': inputs, 'outputs': outputs}
+                summary['rendered'].append(doc)
+                # Save as we go so an interrupted build keeps finished documents
+                save_cache(cache_path, cache)
+
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the course's Quarto documents, skipping unchanged ones.")
+    parser.add_argument('paths', nargs='*', default=[os.path.join(REPO_ROOT, 'topics')],
+                        help=".qmd files or directories to search (default: topics)")
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help="directories to render at the same time (default: one per CPU)")
+    parser.add_argument('--force', action='store_true',
+                        help="render every document even if its inputs are unchanged")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="list the documents that would be rendered")
+    parser.add_argument('--quarto', default='quarto',
+                        help="Quarto executable (default: quarto)")
+    parser.add_argument('--cache', default=None,
+                        help=f"render cache file (default: {CACHE_FILENAME} in the repository root)")
+    parser.epilog = "Arguments after -- are passed on to quarto render (e.g. -- --to html)."
+    # argparse cannot mix optional paths with pass-through arguments, so split at -- first
+    argv = sys.argv[1:]
+    render_args = []
+    if '--' in argv:
+        argv, render_args = argv[:argv.index('--')], argv[argv.index('--') + 1:]
+    args = parser.parse_args(argv)
+
+    for path in args.paths:
+        if not os.path.exists(path):
+            print(f"✗ Not found: {path}")
+    docs = find_documents([p for p in args.paths if os.path.exists(p)])
+    if not docs:
+        print("No Quarto documents found.")
+        return 0
+
+    start = time.time()
+    summary = render_documents(docs, args.quarto, args.jobs, args.force, args.dry_run,
+                               render_args, args.cache)
+    verb = "Would render" if args.dry_run else "Rendered"
+    print(f"{verb} {len(summary['rendered'])} of {len(docs)} documents "
+          f"({len(summary['skipped'])} up to date, {len(summary['failed'])} failed) "
+          f"in {time.time() - start:.1f}s")
+    return 1 if summary['failed'] else 0
+
+if __name__ == "__main__":
+    exit(main())
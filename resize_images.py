@@ -1,33 +1,200 @@
 #!/usr/bin/env python3
 """
 Script to resize large PNG images to make them more manageable for GitHub.
+
+Usage: python resize_images.py [PATH ...] [--min-size MB] [--format FORMAT] [--workers N]
+       python resize_images.py --guard [--staged | --changed-paths FILE] [--remove-originals]
+
+Every image under the given files or directories (default: student-portfolios)
+that is larger than --min-size is downscaled in parallel and written next to
+the original as <name>_resized.<ext>. --format picks the encoder: baseline or
+progressive JPEG (transparency flattened onto white), WebP, AVIF or lossless
+PNG, or auto to encode with several of them at once and keep the smallest
+file whose PSNR stays above --min-psnr. Results are recorded in .resize_cache.json
+so images whose source and settings are unchanged are skipped on the next run;
+use --force to re-encode everything.
+
+--guard is meant for pre-commit hooks and CI: it checks only the staged files
+(--staged), the files listed in --changed-paths (- for stdin) or the given
+paths, treats images over --min-size or wider/taller than --max-dimension as
+offenders, re-encodes them and points the image references in the README.md
+files above them at the optimized copy. With --staged the exit status is 1
+while an offender is still staged, and the git commands that stage the
+optimized copy and unstage the original are printed.
 """
 
-from PIL import Image
+from PIL import Image, ImageChops, ImageOps, ImageStat, features
+import io
 import os
+import math
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import shlex
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+# Resized copies are written next to the original as <name>_resized.<ext>
+# (<name>_<source ext>_resized.<ext> when a.png and a.jpg sit side by side)
+RESIZED_MARKER = '_resized'
+CACHE_FILENAME = '.resize_cache.json'
+# Bump when resize_image() output changes for the same settings
+RESIZE_VERSION = 3
+# Output format name -> (Pillow format, extension, extra save options)
+OUTPUT_FORMATS = {
+    'jpeg': ('JPEG', '.jpg', {'optimize': True}),
+    'progressive': ('JPEG', '.jpg', {'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', '.webp', {'method': 6}),
+    'avif': ('AVIF', '.avif', {}),
+    'png': ('PNG', '.png', {'optimize': True}),
+}
+# Formats tried by --format auto (skipped when Pillow cannot write them)
+AUTO_CANDIDATES = ['progressive', 'webp', 'avif', 'png']
+# Lowest PSNR in dB that --format auto accepts from a lossy encoder
+MIN_PSNR = 32.0
+# --guard also flags images with a side longer than this many pixels
+MAX_DIMENSION = 2000
 
-def resize_image(input_path, output_path, max_width=800, max_height=600, quality=85):
+def format_available(output_format):
+    """Return whether the installed Pillow can write an output format."""
+    Image.init()
+    pillow_format = OUTPUT_FORMATS[output_format][0]
+    if pillow_format == 'WEBP' and not features.check('webp'):
+        return False
+    return pillow_format in Image.SAVE
+
+def flatten_on_white(img):
+    """Composite an image with transparency onto a white background."""
+    img = img.convert('RGBA')
+    background = Image.new('RGB', img.size, (255, 255, 255))
+    background.paste(img, mask=img.getchannel('A'))
+    return background
+
+def prepare_image(img, output_format):
+    """
+    Convert a decoded image to a mode the output format can store.
+    
+    JPEG has no alpha channel, so transparent images are flattened onto
+    white; the other formats keep transparency.
+    """
+    has_alpha = img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+    if OUTPUT_FORMATS[output_format][0] == 'JPEG':
+        if has_alpha:
+            return flatten_on_white(img)
+        return img if img.mode == 'RGB' else img.convert('RGB')
+    mode = 'RGBA' if has_alpha else 'RGB'
+    return img if img.mode == mode else img.convert(mode)
+
+def encode_image(img, output_format, quality):
+    """Encode an image in one of OUTPUT_FORMATS and return the file's bytes."""
+    pillow_format, _, options = OUTPUT_FORMATS[output_format]
+    buffer = io.BytesIO()
+    if pillow_format == 'PNG':
+        img.save(buffer, pillow_format, **options)  # Lossless; quality does not apply
+    else:
+        img.save(buffer, pillow_format, quality=quality, **options)
+    return buffer.getvalue()
+
+def psnr(reference, data):
+    """
+    Measure how closely encoded image data reproduces a reference image.
+    
+    Transparent images are compared as they look on a white page, plus
+    their alpha channel, so colours hidden under fully transparent pixels
+    do not count.
+    
+    Args:
+        reference: Image that was encoded
+        data: Encoded file contents
+        
+    Returns:
+        Peak signal-to-noise ratio in dB (infinite for an exact copy)
+    """
+    with Image.open(io.BytesIO(data)) as decoded:
+        decoded = decoded.convert(reference.mode)
+    if reference.mode == 'RGBA':
+        pairs = [(flatten_on_white(reference), flatten_on_white(decoded)),
+                 (reference.getchannel('A'), decoded.getchannel('A'))]
+    else:
+        pairs = [(reference, decoded)]
+    bands = [rms for expected, actual in pairs
+             for rms in ImageStat.Stat(ImageChops.difference(expected, actual)).rms]
+    mse = sum(rms * rms for rms in bands) / len(bands)
+    return math.inf if mse == 0 else 10 * math.log10(255 * 255 / mse)
+
+def choose_encoding(img, quality, min_psnr):
+    """
+    Encode an image with every AUTO_CANDIDATES format and keep the smallest acceptable file.
+    
+    The candidates are encoded concurrently on threads (Pillow releases the
+    GIL while encoding); JPEG is left out for transparent images.
+    
+    Args:
+        img: Decoded, already resized image
+        quality: Quality (1-100) for the lossy formats
+        min_psnr: Lowest acceptable PSNR in dB against img
+        
+    Returns:
+        Tuple of (output format, encoded bytes)
+    """
+    has_alpha = img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+    candidates = [output_format for output_format in AUTO_CANDIDATES
+                  if format_available(output_format)
+                  and not (has_alpha and OUTPUT_FORMATS[output_format][0] == 'JPEG')]
+    prepared = {output_format: prepare_image(img, output_format) for output_format in candidates}
+    with ThreadPoolExecutor(max_workers=len(candidates)) as pool:
+        encoded = dict(zip(candidates, pool.map(
+            lambda output_format: encode_image(prepared[output_format].copy(), output_format, quality),
+            candidates)))
+    
+    # Smallest first; lossless PNG always passes, so something is returned
+    for output_format in sorted(candidates, key=lambda candidate: len(encoded[candidate])):
+        if (OUTPUT_FORMATS[output_format][0] == 'PNG'
+                or psnr(prepared[output_format], encoded[output_format]) >= min_psnr):
+            return output_format, encoded[output_format]
+    return 'png', encoded['png']
+
+def resize_image(input_path, output_path, max_width=800, max_height=600, quality=85, verbose=True,
+                 output_format='jpeg', min_psnr=MIN_PSNR):
     """
     Resize an image while maintaining aspect ratio.
     
     Args:
         input_path: Path to input image
-        output_path: Path to output image
+        output_path: Path to output image; with output_format 'auto' its
+            extension is replaced by the chosen format's
         max_width: Maximum width in pixels
         max_height: Maximum height in pixels
-        quality: JPEG quality (1-100) for output
+        quality: Quality (1-100) for lossy output formats
+        verbose: Print a size report for the image
+        output_format: One of OUTPUT_FORMATS, or 'auto' for the smallest
+            candidate that keeps at least min_psnr
+        min_psnr: Quality floor in dB for 'auto'
+        
+    Returns:
+        Tuple of (original_size, new_size, output_path) with sizes in bytes,
+        or None on error
     """
     try:
         # Open the image
         with Image.open(input_path) as img:
-            # Convert to RGB if necessary (PNG might have transparency)
-            if img.mode in ('RGBA', 'LA', 'P'):
-                # Create a white background
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
+            # For JPEGs (and the MPO files phone cameras save, which are JPEGs
+            # underneath), let the decoder scale by 1/2, 1/4 or 1/8 while
+            # decoding so the full-resolution bitmap is never materialized.
+            # draft() keeps the result at least as large as the target.
+            width, height = img.size
+            ratio = min(max_width / width, max_height / height)
+            if ratio < 1 and img.format in ('JPEG', 'MPO'):
+                img.draft(img.mode, (int(width * ratio), int(height * ratio)))
+            img.load()
+            # Bake in the EXIF Orientation of phone photos before sizing, as
+            # the copy is written without the tag
+            img = ImageOps.exif_transpose(img)
             
             # Calculate new dimensions while maintaining aspect ratio
             width, height = img.size
@@ -36,50 +203,545 @@ def resize_image(input_path, output_path, max_width=800, max_height=600, quality
             if ratio < 1:  # Only resize if image is larger than max dimensions
                 new_width = int(width * ratio)
                 new_height = int(height * ratio)
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+                if img.mode == 'P':
+                    img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+                # reducing_gap box-reduces by an integer factor first (cheap
+                # for non-JPEG sources), then finishes with a Lanczos pass
+                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS,
+                                 reducing_gap=3.0)
             
-            # Save as JPEG with specified quality
-            img.save(output_path, 'JPEG', quality=quality, optimize=True)
+            if output_format == 'auto':
+                output_format, data = choose_encoding(img, quality, min_psnr)
+                output_path = os.path.splitext(output_path)[0] + OUTPUT_FORMATS[output_format][1]
+            else:
+                data = encode_image(prepare_image(img, output_format), output_format, quality)
+            with open(output_path, 'wb') as f:
+                f.write(data)
+            remove_stale_outputs(output_path)
             
             # Get file sizes
             original_size = os.path.getsize(input_path)
-            new_size = os.path.getsize(output_path)
+            new_size = len(data)
+            
+            if verbose:
+                print(f"✓ Resized {input_path} to {output_path}")
+                print(f"  Original: {original_size / (1024*1024):.1f} MB")
+                print(f"  New: {new_size / (1024*1024):.1f} MB ({OUTPUT_FORMATS[output_format][0]})")
+                print(f"  Reduction: {((original_size - new_size) / original_size * 100):.1f}%")
+                print()
             
-            print(f"✓ Resized {input_path}")
-            print(f"  Original: {original_size / (1024*1024):.1f} MB")
-            print(f"  New: {new_size / (1024*1024):.1f} MB")
-            print(f"  Reduction: {((original_size - new_size) / original_size * 100):.1f}%")
-            print()
+            return original_size, new_size, output_path
             
     except Exception as e:
         print(f"✗ Error processing {input_path}: {e}")
+        return None
+
+def resized_output_path(img_path, output_format='jpeg'):
+    """
+    Return the output path used for a resized copy of img_path.
+    
+    Normally this is <name>_resized.<ext>. When another image in the same
+    directory has the same name with a different extension, the source
+    extension is worked into the name (photo.png -> photo_png_resized.jpg)
+    so the two copies do not overwrite each other. For 'auto' this is the
+    JPEG path; resize_image() swaps in the extension of the format it picks.
+    """
+    extension = OUTPUT_FORMATS.get(output_format, OUTPUT_FORMATS['jpeg'])[1]
+    stem, source_extension = os.path.splitext(img_path)
+    name = os.path.basename(img_path)
+    try:
+        siblings = os.listdir(os.path.dirname(img_path) or '.')
+    except OSError:
+        siblings = []
+    if any(other != name and os.path.splitext(other)[0] == os.path.basename(stem)
+           and other.lower().endswith(IMAGE_EXTENSIONS) for other in siblings):
+        stem += '_' + source_extension.lstrip('.').lower()
+    return stem + RESIZED_MARKER + extension
+
+def remove_stale_outputs(output_path):
+    """
+    Delete resized copies of the same image written in other formats.
+    
+    With --format auto (or after switching --format) a new run may pick a
+    different extension than the last one; the old copy would otherwise be
+    left next to the new one. A copy that a README still shows (one --guard
+    pointed it at earlier) is kept, so no portfolio loses an image;
+    guard_images() moves such READMEs on to the new copy and then removes it.
+    """
+    for stale_path in stale_outputs(output_path):
+        if not is_referenced(stale_path):
+            os.remove(stale_path)
+
+def stale_outputs(output_path):
+    """Return the existing resized copies of the same image in formats other than output_path's."""
+    prefix, written_extension = os.path.splitext(output_path)
+    extensions = {format_info[1] for format_info in OUTPUT_FORMATS.values()} - {written_extension}
+    return [prefix + extension for extension in sorted(extensions) if os.path.exists(prefix + extension)]
+
+def is_referenced(image_path):
+    """Return whether a README.md in or above an image's directory shows the image."""
+    for readme in referencing_readmes(image_path):
+        try:
+            with open(readme, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except OSError:
+            return True  # Keep the image when in doubt
+        if image_reference_pattern(readme, image_path).search(content):
+            return True
+    return False
+
+def find_images(paths):
+    """
+    Find the source images among files and directories.
+    
+    Hidden files and directories and earlier resize outputs are skipped.
+    
+    Args:
+        paths: Files or directories to search
+        
+    Returns:
+        List of image paths
+    """
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            candidates = [path]
+        else:
+            candidates = []
+            for root, dirs, files in os.walk(path):
+                dirs[:] = [d for d in dirs if not d.startswith('.')]
+                candidates.extend(os.path.join(root, name) for name in files)
+        
+        for candidate in candidates:
+            name = os.path.basename(candidate)
+            if name.startswith('.') or os.path.splitext(name)[0].endswith(RESIZED_MARKER):
+                continue
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                found.append(candidate)
+    return found
+
+def find_oversized_images(paths, min_size):
+    """
+    Find images larger than min_size bytes.
+    
+    Args:
+        paths: Files or directories to search
+        min_size: Minimum file size in bytes for an image to be selected
+        
+    Returns:
+        Sorted list of image paths
+    """
+    return sorted(path for path in find_images(paths) if os.path.getsize(path) >= min_size)
+
+def image_dimensions(path):
+    """Return (width, height) read from an image's header, or None if it cannot be read."""
+    try:
+        # Image.open() only parses the header; pixels load on first access
+        with Image.open(path) as img:
+            return img.size
+    except Exception:
+        return None
+
+def find_offending_images(paths, min_size, max_dimension):
+    """
+    Find images that are too big to commit, by file size or by dimensions.
+    
+    Args:
+        paths: Files or directories to search
+        min_size: File size in bytes from which an image is an offender
+        max_dimension: Longest allowed side in pixels
+        
+    Returns:
+        Sorted list of (image path, reason) pairs
+    """
+    offenders = []
+    for path in find_images(paths):
+        size = os.path.getsize(path)
+        dimensions = image_dimensions(path)
+        if size >= min_size:
+            offenders.append((path, f"{size / (1024*1024):.1f} MB"))
+        elif dimensions and max(dimensions) > max_dimension:
+            offenders.append((path, f"{dimensions[0]}x{dimensions[1]} px"))
+    return sorted(offenders)
+
+def staged_files():
+    """Return the files added or modified in the git index, relative to the current directory."""
+    try:
+        result = subprocess.run(['git', 'diff', '--cached', '--name-only', '--diff-filter=AM',
+                                 '--relative', '-z'], capture_output=True, text=True, encoding='utf-8')
+    except OSError as e:
+        print(f"✗ Could not run git: {e}")
+        return []
+    if result.returncode != 0:
+        print(f"✗ Could not list staged files: {result.stderr.strip()}")
+        return []
+    return [path for path in result.stdout.split('\0') if path]
+
+def referencing_readmes(image_path):
+    """Return the README.md files in an image's directory and the directories above it, up to the current one."""
+    readmes = []
+    directory = os.path.dirname(os.path.abspath(image_path))
+    top = os.getcwd()
+    while True:
+        readme = os.path.join(directory, 'README.md')
+        if os.path.isfile(readme):
+            readmes.append(os.path.relpath(readme))
+        if directory == top or os.path.dirname(directory) == directory:
+            break
+        directory = os.path.dirname(directory)
+    return readmes
+
+def image_reference_pattern(readme_path, image_path):
+    """
+    Compile a pattern for a README's references to an image.
+    
+    Matches ![alt](path "title"), ![alt](<path>) and <img src="path"> with
+    the path relative to the README, optionally prefixed with ./ and with
+    spaces possibly written as %20. Group 3 is the path as written.
+    """
+    readme_dir = os.path.dirname(readme_path) or '.'
+    old = os.path.relpath(image_path, readme_dir).replace(os.sep, '/')
+    return re.compile(
+        r'(!\[[^\]]*\]\(\s*<?|<img\s[^>]*?src=["\'])(\./)?('
+        + '|'.join(re.escape(variant) for variant in {old, old.replace(' ', '%20')})
+        + r')(?=[>\s)"\'])')
+
+def rewrite_image_references(readme_path, image_path, new_path):
+    """
+    Point a README's markdown and HTML image references at a new file.
+    
+    Args:
+        readme_path: Path to the README.md file
+        image_path: Path of the image currently referenced
+        new_path: Path of the image to reference instead
+        
+    Returns:
+        True if the README was changed
+    """
+    readme_dir = os.path.dirname(readme_path) or '.'
+    new = os.path.relpath(new_path, readme_dir).replace(os.sep, '/')
+    pattern = image_reference_pattern(readme_path, image_path)
+    
+    try:
+        with open(readme_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except OSError as e:
+        print(f"✗ Could not read {readme_path}: {e}")
+        return False
+    
+    new_content = pattern.sub(
+        lambda m: m.group(1) + (m.group(2) or '') + (new.replace(' ', '%20') if '%20' in m.group(3) else new),
+        content)
+    if new_content == content:
+        return False
+    
+    # Replace the README in one step so an interrupted run cannot truncate it
+    fd, tmp_path = tempfile.mkstemp(dir=readme_dir, prefix='.README.md.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(new_content)
+        os.replace(tmp_path, readme_path)
+    except OSError as e:
+        os.unlink(tmp_path)
+        print(f"✗ Could not update {readme_path}: {e}")
+        return False
+    return True
+
+def hash_file(path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def resize_settings(max_width, max_height, quality, output_format='jpeg', min_psnr=MIN_PSNR):
+    """Return the settings that determine resize_image() output, for the cache key."""
+    return {
+        'version': RESIZE_VERSION,
+        'max_width': max_width,
+        'max_height': max_height,
+        'quality': quality,
+        'format': output_format,
+        'min_psnr': min_psnr if output_format == 'auto' else None,
+    }
+
+def load_cache(cache_path):
+    """Load the resize cache, returning an empty cache if it is missing or unreadable."""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warning: Ignoring unreadable cache {cache_path}: {e}")
+        return {}
+
+def save_cache(cache_path, cache):
+    """Write the resize cache."""
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+    except OSError as e:
+        print(f"Warning: Could not write cache {cache_path}: {e}")
+
+def cached_resize_image(input_path, output_path, settings, entry=None):
+    """
+    Resize an image unless the cache shows the output is already up to date.
+    
+    Args:
+        input_path: Path to input image
+        output_path: Path to output image (see resized_output_path())
+        settings: Dictionary returned by resize_settings()
+        entry: Cache entry from a previous run, if any
+        
+    Returns:
+        Tuple of (skipped, original_size, new_size, new_entry), or None on
+        error; new_entry['path'] is the file actually written
+    """
+    try:
+        source_hash = hash_file(input_path)
+        cached_path = entry.get('path', output_path) if entry else output_path
+        if (entry and entry.get('source') == source_hash and entry.get('settings') == settings
+                and os.path.exists(cached_path) and hash_file(cached_path) == entry.get('output')):
+            return True, os.path.getsize(input_path), os.path.getsize(cached_path), entry
+    except OSError as e:
+        print(f"✗ Error processing {input_path}: {e}")
+        return None
+    
+    result = resize_image(input_path, output_path, settings['max_width'], settings['max_height'],
+                          settings['quality'], verbose=False, output_format=settings['format'],
+                          min_psnr=settings['min_psnr'] or MIN_PSNR)
+    if result is None:
+        return None
+    original_size, new_size, written_path = result
+    new_entry = {'source': source_hash, 'settings': settings, 'output': hash_file(written_path),
+                 'path': written_path}
+    return False, original_size, new_size, new_entry
+
+def resize_images(images, max_width=800, max_height=600, quality=85, workers=None,
+                  cache_path=CACHE_FILENAME, force=False, output_format='jpeg', min_psnr=MIN_PSNR):
+    """
+    Resize many images across a process pool.
+    
+    Args:
+        images: Paths of the images to resize
+        max_width: Maximum width in pixels
+        max_height: Maximum height in pixels
+        quality: Quality (1-100) for lossy output formats
+        workers: Number of worker processes (default: one per CPU)
+        cache_path: Path of the resize cache, or None to disable it
+        force: Re-encode every image even if the cache says it is up to date
+        output_format: One of OUTPUT_FORMATS, or 'auto' (see resize_image())
+        min_psnr: Quality floor in dB for 'auto'
+        
+    Returns:
+        Dictionary with counts, byte totals, elapsed seconds, 'outputs',
+        mapping each successfully processed image to its resized copy, and
+        'written', the images whose copy was encoded in this run rather
+        than found up to date in the cache
+    """
+    summary = {'resized': 0, 'skipped': 0, 'failed': 0, 'original_bytes': 0, 'new_bytes': 0,
+               'outputs': {}, 'written': set()}
+    start = time.perf_counter()
+    settings = resize_settings(max_width, max_height, quality, output_format, min_psnr)
+    cache = load_cache(cache_path) if cache_path else {}
+    
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = {}
+        for img_path in images:
+            output_path = resized_output_path(img_path, output_format)
+            entry = None if force else cache.get(output_path)
+            future = executor.submit(cached_resize_image, img_path, output_path, settings, entry)
+            futures[future] = img_path, output_path
+        
+        for future in as_completed(futures):
+            img_path, output_path = futures[future]
+            result = future.result()
+            if result is None:
+                summary['failed'] += 1
+                continue
+            skipped, original_size, new_size, cache[output_path] = result
+            output_path = cache[output_path].get('path', output_path)
+            summary['outputs'][img_path] = output_path
+            summary['original_bytes'] += original_size
+            summary['new_bytes'] += new_size
+            if skipped:
+                summary['skipped'] += 1
+                continue
+            summary['resized'] += 1
+            summary['written'].add(img_path)
+            print(f"✓ {output_path}: {original_size / (1024*1024):.1f} MB → {new_size / (1024*1024):.2f} MB")
+    
+    if cache_path:
+        save_cache(cache_path, cache)
+    summary['elapsed'] = time.perf_counter() - start
+    return summary
+
+def guard_images(paths, min_size, max_dimension, max_width=800, max_height=600, quality=85,
+                 workers=None, cache_path=CACHE_FILENAME, remove_originals=False,
+                 output_format='jpeg', min_psnr=MIN_PSNR):
+    """
+    Re-encode images that are too big to commit and update the READMEs that show them.
+    
+    Args:
+        paths: Files or directories to check
+        min_size: File size in bytes from which an image is an offender
+        max_dimension: Longest allowed side in pixels
+        max_width: Maximum width in pixels of the optimized copy
+        max_height: Maximum height in pixels of the optimized copy
+        quality: Quality (1-100) of the optimized copy
+        workers: Number of worker processes (default: one per CPU)
+        cache_path: Path of the resize cache, or None to disable it
+        remove_originals: Delete each offender once its copy is written
+        output_format: One of OUTPUT_FORMATS, or 'auto' (see resize_image())
+        min_psnr: Quality floor in dB for 'auto'
+        
+    Returns:
+        Tuple of (fixed, replaced): the number of offenders this run changed
+        something for (a new copy, a rewritten README or a removed
+        original), and a dictionary mapping every offender that has an
+        optimized copy to that copy
+    """
+    offenders = find_offending_images(paths, min_size, max_dimension)
+    if not offenders:
+        print("✓ No oversized images")
+        return 0, {}
+    
+    for path, reason in offenders:
+        print(f"✗ {path} is too big ({reason})")
+    summary = resize_images([path for path, _ in offenders], max_width, max_height, quality, workers,
+                            cache_path=cache_path, output_format=output_format, min_psnr=min_psnr)
+    
+    fixed = 0
+    replaced = {}
+    for path, _ in offenders:
+        output_path = summary['outputs'].get(path)
+        if output_path is None:
+            continue
+        replaced[path] = output_path
+        # A copy found in the cache with READMEs already pointing at it is
+        # not a fix, or every later run would report the same image again
+        changed = path in summary['written']
+        for readme in referencing_readmes(path):
+            # READMEs may show the original or a copy from a run in another format
+            for shown in [path] + stale_outputs(output_path):
+                if rewrite_image_references(readme, shown, output_path):
+                    print(f"✓ {readme} now shows {os.path.basename(output_path)}")
+                    changed = True
+        for stale_path in stale_outputs(output_path):
+            if not is_referenced(stale_path):
+                os.remove(stale_path)
+                print(f"✓ Removed {stale_path}")
+        if remove_originals:
+            os.remove(path)
+            print(f"✓ Removed {path}")
+            changed = True
+        if changed:
+            fixed += 1
+    
+    if summary['failed']:
+        print(f"✗ {summary['failed']} images could not be processed")
+    return fixed, replaced
 
 def main():
-    # Define the images to resize
-    images = [
-        "student-portfolios/SamR/IMG_00633.png",
-        "student-portfolios/SamR/IMG_2206.png"
-    ]
+    parser = argparse.ArgumentParser(description="Downscale oversized images for GitHub.")
+    parser.add_argument('paths', nargs='*', default=['student-portfolios'],
+                        help="image files or directories to search (default: student-portfolios)")
+    parser.add_argument('--min-size', type=float, default=1.0,
+                        help="only resize images of at least this many MB (default: 1.0)")
+    parser.add_argument('--max-width', type=int, default=800)
+    parser.add_argument('--max-height', type=int, default=600)
+    parser.add_argument('--quality', type=int, default=85,
+                        help="quality (1-100) for lossy formats (default: 85)")
+    parser.add_argument('--format', dest='output_format', default='jpeg',
+                        choices=list(OUTPUT_FORMATS) + ['auto'],
+                        help="output format; 'auto' keeps the smallest of several encoders "
+                             "that stays above --min-psnr (default: jpeg)")
+    parser.add_argument('--min-psnr', type=float, default=MIN_PSNR,
+                        help=f"quality floor in dB for --format auto (default: {MIN_PSNR})")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument('--cache', default=CACHE_FILENAME,
+                        help=f"resize cache file (default: {CACHE_FILENAME})")
+    parser.add_argument('--force', action='store_true',
+                        help="re-encode images even if their cached output is up to date")
+    guard = parser.add_argument_group('guard mode (pre-commit hooks and CI)')
+    guard.add_argument('--guard', action='store_true',
+                       help="re-encode offending images and point their README references at the copies")
+    sources = guard.add_mutually_exclusive_group()
+    sources.add_argument('--staged', action='store_true',
+                         help="check the files staged in git (exit status 1 if anything was fixed)")
+    sources.add_argument('--changed-paths', type=argparse.FileType('r', encoding='utf-8'), metavar='FILE',
+                         help="check the files listed in FILE, one per line (- for stdin)")
+    guard.add_argument('--max-dimension', type=int, default=MAX_DIMENSION,
+                       help=f"also flag images with a longer side than this (default: {MAX_DIMENSION})")
+    guard.add_argument('--remove-originals', action='store_true',
+                       help="delete offending images once their optimized copy is referenced")
+    args = parser.parse_args()
+    
+    if args.output_format != 'auto' and not format_available(args.output_format):
+        print(f"✗ This Pillow installation cannot write {args.output_format} images")
+        return 1
+    
+    if args.guard:
+        if args.staged:
+            paths = staged_files()
+        elif args.changed_paths:
+            paths = args.changed_paths.read().splitlines()
+        else:
+            paths = args.paths
+        fixed, replaced = guard_images([p for p in paths if os.path.isfile(p) or os.path.isdir(p)],
+                                       int(args.min_size * 1024 * 1024), args.max_dimension,
+                                       args.max_width, args.max_height, args.quality, args.workers,
+                                       cache_path=args.cache, remove_originals=args.remove_originals,
+                                       output_format=args.output_format, min_psnr=args.min_psnr)
+        if replaced and args.staged:
+            # The originals are still staged until they are taken out of the
+            # index, so say how; committing again without that would fail again
+            if fixed:
+                print(f"Optimized {fixed} images.")
+            readmes = sorted({readme for path in replaced for readme in referencing_readmes(path)})
+            print("Review the changes, commit the optimized copies instead of the originals "
+                  "(which stay on disk), then commit again:")
+            print("  git add " + ' '.join(shlex.quote(p) for p in sorted(replaced.values()) + readmes))
+            print("  git rm --cached " + ' '.join(shlex.quote(p) for p in sorted(replaced)))
+            return 1
+        return 0
+    
+    for path in args.paths:
+        if not os.path.exists(path):
+            print(f"✗ Image not found: {path}")
+    images = find_oversized_images([p for p in args.paths if os.path.exists(p)],
+                                   int(args.min_size * 1024 * 1024))
     
     print("Resizing images for GitHub compatibility...")
     print("=" * 50)
     
-    for img_path in images:
-        if os.path.exists(img_path):
-            # Create output path (change extension to .jpg)
-            output_path = img_path.replace('.png', '_resized.jpg')
-            
-            # Resize the image
-            resize_image(img_path, output_path, max_width=800, max_height=600, quality=85)
-        else:
-            print(f"✗ Image not found: {img_path}")
+    if not images:
+        print("No oversized images found.")
+        return
+    
+    summary = resize_images(images, args.max_width, args.max_height, args.quality, args.workers,
+                            cache_path=args.cache, force=args.force,
+                            output_format=args.output_format, min_psnr=args.min_psnr)
     
+    original_mb = summary['original_bytes'] / (1024*1024)
+    saved_mb = (summary['original_bytes'] - summary['new_bytes']) / (1024*1024)
+    elapsed = max(summary['elapsed'], 1e-9)
     print("=" * 50)
+    print(f"Resized {summary['resized']} of {len(images)} images "
+          f"({summary['skipped']} already up to date) in {summary['elapsed']:.2f}s "
+          f"({len(images) / elapsed:.1f} images/s, {original_mb / elapsed:.1f} MB/s)")
+    print(f"Saved {saved_mb:.1f} MB of {original_mb:.1f} MB")
+    if summary['failed']:
+        print(f"✗ {summary['failed']} images could not be processed")
+    print()
     print("Resizing complete! You can now:")
     print("1. Review the resized images")
-    print("2. Replace the original PNG files with the resized JPG files")
+    print("2. Replace the original files with the resized files")
     print("3. Update your git commit to use the smaller files")
     print("4. Push to GitHub successfully!")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
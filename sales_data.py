@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Compact, cached loader for datasets/salesPriceData.csv.
+
+Usage: python sales_data.py [CSV] [--cache-dir DIR] [--rebuild]
+
+The CSV is parsed once with explicit compact dtypes (int32 prices and areas,
+int16 years, int8 counts and a categorical zipCode stored as int8 codes plus
+a table of zip codes) and cached next to it in .cache/<name>/ as one .npy
+file per column. Later loads memory-map those files, so they are close to
+instant and only the columns actually touched are read from disk. The cache
+is rebuilt automatically when the CSV changes.
+
+From Python:
+
+    from sales_data import load_sales_data
+    sales = load_sales_data()
+    sales['SalePrice']            # int32 array
+    sales.decoded('zipCode')      # zip code of every row
+    sales.to_dataframe()          # pandas DataFrame (needs pandas)
+
+load_table() takes any CSV of integer columns with a schema of the same
+form, for larger housing datasets.
+"""
+
+import os
+import json
+import hashlib
+import argparse
+import tempfile
+import numpy as np
+
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datasets', 'salesPriceData.csv')
+CACHE_DIRNAME = '.cache'
+# Bump when the cache layout changes
+CACHE_VERSION = 1
+
+# Column name -> NumPy dtype, or 'category' for a column stored as codes
+SALES_PRICE_SCHEMA = {
+    'SalePrice': 'int32',
+    'LotArea': 'int32',
+    'YearBuilt': 'int16',
+    'GrLivArea': 'int32',
+    'FullBath': 'int8',
+    'HalfBath': 'int8',
+    'BedroomAbvGr': 'int8',
+    'TotRmsAbvGrd': 'int8',
+    'GarageCars': 'int8',
+    'zipCode': 'category',
+}
+
+class Table:
+    """
+    Columns of a loaded dataset, each a NumPy array with its compact dtype.
+
+    Categorical columns hold integer codes into categories(name).
+    """
+
+    def __init__(self, columns, categories):
+        self.columns = columns
+        self._categories = categories
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __repr__(self):
+        dtypes = ', '.join(f"{name}: {'category' if name in self._categories else column.dtype}"
+                           for name, column in self.columns.items())
+        return f"Table({len(self)} rows; {dtypes})"
+
+    @property
+    def names(self):
+        """Column names in file order."""
+        return list(self.columns)
+
+    def categories(self, name):
+        """Return the values the codes of a categorical column stand for."""
+        return self._categories[name]
+
+    def decoded(self, name):
+        """Return a column's values, looking up the codes of a categorical column."""
+        if name in self._categories:
+            return self._categories[name][self.columns[name]]
+        return self.columns[name]
+
+    def nbytes(self):
+        """Return the memory the columns take when fully loaded."""
+        return (sum(column.nbytes for column in self.columns.values())
+                + sum(values.nbytes for values in self._categories.values()))
+
+    def to_dataframe(self):
+        """Return the table as a pandas DataFrame with categorical columns as pandas Categoricals."""
+        import pandas as pd
+
+        data = {}
+        for name, column in self.columns.items():
+            if name in self._categories:
+                data[name] = pd.Categorical.from_codes(np.asarray(column), self._categories[name])
+            else:
+                data[name] = np.asarray(column)
+        return pd.DataFrame(data)
+
+def smallest_code_dtype(count):
+    """Return the smallest signed integer dtype that can index count categories."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if count <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+def parse_csv(csv_path, schema):
+    """
+    Parse a CSV of integer columns into compact NumPy columns.
+
+    Args:
+        csv_path: Path to the CSV file; its header must name every schema column
+        schema: Column name -> dtype name, or 'category'
+
+    Returns:
+        Tuple of (columns, categories) dictionaries
+
+    Raises:
+        ValueError: If a column is missing or a value does not fit its dtype
+    """
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        header = f.readline().strip().split(',')
+    missing = [name for name in schema if name not in header]
+    if missing:
+        raise ValueError(f"{csv_path} has no column(s) {', '.join(missing)}")
+
+    # One vectorized parse of the whole file, then a narrowing cast per column
+    usecols = [header.index(name) for name in schema]
+    raw = np.loadtxt(csv_path, delimiter=',', skiprows=1, usecols=usecols, dtype=np.int64, ndmin=2)
+
+    columns = {}
+    categories = {}
+    for i, (name, dtype) in enumerate(schema.items()):
+        values = raw[:, i]
+        if dtype == 'category':
+            categories[name], codes = np.unique(values, return_inverse=True)
+            columns[name] = codes.astype(smallest_code_dtype(len(categories[name])))
+            continue
+        info = np.iinfo(dtype)
+        if values.size and (values.min() < info.min or values.max() > info.max):
+            raise ValueError(f"{name} has values outside the range of {dtype} "
+                             f"({values.min()} to {values.max()})")
+        columns[name] = values.astype(dtype)
+    return columns, categories
+
+def hash_file(path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def default_cache_dir(csv_path):
+    """Return the cache directory used for a CSV file: .cache/<name>/ next to it."""
+    directory, filename = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(directory, CACHE_DIRNAME, os.path.splitext(filename)[0])
+
+def read_cache_meta(cache_dir, csv_path, schema):
+    """
+    Return the cache's metadata if it was built from the current CSV with this schema, else None.
+
+    The CSV's size and mtime are compared first; if only the mtime moved
+    (e.g. after a fresh checkout) the content hash decides.
+    """
+    try:
+        with open(os.path.join(cache_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        stat = os.stat(csv_path)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    if meta.get('version') != CACHE_VERSION or meta.get('schema') != schema:
+        return None
+    if meta.get('size') != stat.st_size:
+        return None
+    if meta.get('mtime_ns') != stat.st_mtime_ns and meta.get('sha256') != hash_file(csv_path):
+        return None
+    return meta
+
+def write_cache(cache_dir, csv_path, schema, columns, categories):
+    """
+    Save parsed columns as .npy files plus a meta.json describing the source CSV.
+
+    meta.json is replaced last, so a cache interrupted halfway is never
+    mistaken for a valid one.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    arrays = dict(columns)
+    arrays.update({f"{name}.categories": values for name, values in categories.items()})
+    for name, array in arrays.items():
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.npy.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp_path, os.path.join(cache_dir, f"{name}.npy"))
+
+    stat = os.stat(csv_path)
+    meta = {
+        'version': CACHE_VERSION,
+        'schema': schema,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': hash_file(csv_path),
+        'rows': len(next(iter(columns.values()))) if columns else 0,
+    }
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.json.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=1)
+    os.replace(tmp_path, meta_path)
+
+def load_table(csv_path, schema, cache_dir=None, rebuild=False, mmap=True):
+    """
+    Load a CSV of integer columns through the binary column cache.
+
+    Args:
+        csv_path: Path to the CSV file
+        schema: Column name -> dtype name, or 'category'
+        cache_dir: Where to keep the cache (default: default_cache_dir()),
+            or False to always parse the CSV
+        rebuild: Re-parse the CSV even if the cache is current
+        mmap: Memory-map the cached columns instead of reading them into memory
+
+    Returns:
+        Table with the schema's columns
+    """
+    if cache_dir is False:
+        return Table(*parse_csv(csv_path, schema))
+    cache_dir = cache_dir or default_cache_dir(csv_path)
+
+    if rebuild or read_cache_meta(cache_dir, csv_path, schema) is None:
+        columns, categories = parse_csv(csv_path, schema)
+        try:
+            write_cache(cache_dir, csv_path, schema, columns, categories)
+        except OSError as e:
+            print(f"Warning: Could not write cache {cache_dir}: {e}")
+        return Table(columns, categories)
+
+    mmap_mode = 'r' if mmap else None
+    columns = {name: np.load(os.path.join(cache_dir, f"{name}.npy"), mmap_mode=mmap_mode)
+               for name in schema}
+    categories = {name: np.load(os.path.join(cache_dir, f"{name}.categories.npy"))
+                  for name, dtype in schema.items() if dtype == 'category'}
+    return Table(columns, categories)
+
+def load_sales_data(csv_path=DEFAULT_CSV, cache_dir=None, rebuild=False, mmap=True):
+    """
+    Load datasets/salesPriceData.csv with SALES_PRICE_SCHEMA's compact dtypes.
+
+    Args:
+        csv_path: Path to the CSV file (default: the repository's copy)
+        cache_dir: See load_table()
+        rebuild: Re-parse the CSV even if the cache is current
+        mmap: Memory-map the cached columns instead of reading them into memory
+
+    Returns:
+        Table of the sales data
+    """
+    return load_table(csv_path, SALES_PRICE_SCHEMA, cache_dir, rebuild, mmap)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the binary cache of the sales price data.")
+    parser.add_argument('csv', nargs='?', default=DEFAULT_CSV,
+                        help="CSV file to load (default: datasets/salesPriceData.csv)")
+    parser.add_argument('--cache-dir', default=None,
+                        help="cache directory (default: .cache/<name>/ next to the CSV)")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="re-parse the CSV even if the cache is current")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.csv):
+        print(f"✗ File not found: {args.csv}")
+        return 1
+    table = load_sales_data(args.csv, args.cache_dir, args.rebuild)
+    print(table)
+    print(f"{table.nbytes() / 1024:.1f} KB in memory "
+          f"(CSV: {os.path.getsize(args.csv) / 1024:.1f} KB)")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Seeded, vectorized Monte Carlo simulation of generative models.
+
+Usage: python simulation.py [--draws N] [--tickets T] [--seats S] [--workers W] [--seed SEED]
+
+A generative model is declared as a DAG of named nodes, in the order the
+course draws them: random nodes take a numpy.random.Generator distribution
+whose parameters may name earlier nodes, deterministic nodes compute a value
+from earlier nodes. Sampling draws every node for a whole batch at once as
+arrays, so there are no per-variable hand-written draws and no global
+np.random.seed state:
+
+    from simulation import GenerativeModel
+    model = GenerativeModel()
+    model.random('p', 'uniform', low=0.5, high=1)
+    model.random('passengers', 'binomial', n=3, p='p')
+    model.deterministic('full', lambda passengers: passengers == 3, 'passengers')
+    draws = model.sample(1000, seed=456)        # dict of arrays
+    summary = model.run(10**8, seed=456, histograms=['passengers'])
+
+run() splits large simulations into chunks of chunk_size draws, gives
+every chunk its own stream spawned from one SeedSequence and hands chunks to
+a process pool, keeping only running summaries (mean, standard deviation,
+min, max, event probabilities and integer histograms). Memory is bounded by
+the chunk size and the result depends only on the seed and chunk size, not
+on the number of workers.
+"""
+
+import os
+import time
+import pickle
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+# Histograms are kept as dense counts, so cap the range of values they may span
+MAX_HISTOGRAM_VALUES = 10_000
+
+class GenerativeModel:
+    """
+    A DAG of random and deterministic nodes, drawn in declaration order.
+
+    Every node may only refer to nodes declared before it, which keeps the
+    graph acyclic and makes the declaration order a valid drawing order.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+
+    def __repr__(self):
+        return f"GenerativeModel({', '.join(self.nodes)})"
+
+    def _check_parents(self, name, parents):
+        if name in self.nodes:
+            raise ValueError(f"Node {name!r} is already defined")
+        unknown = [parent for parent in parents if parent not in self.nodes]
+        if unknown:
+            raise ValueError(f"Node {name!r} refers to undefined node(s) {', '.join(unknown)}")
+
+    def random(self, name, distribution, **params):
+        """
+        Add a random node.
+
+        Args:
+            name: Node name
+            distribution: Name of a numpy.random.Generator method (e.g.
+                'binomial', 'uniform', 'normal'), or a function called as
+                distribution(rng, size, **params)
+            **params: Distribution parameters; a string naming an earlier node
+                is replaced by that node's draws, so parameters can vary per draw
+
+        Returns:
+            The node name, for use as a parent
+        """
+        parents = [value for value in params.values() if isinstance(value, str) and value in self.nodes]
+        self._check_parents(name, parents)
+        if isinstance(distribution, str) and not hasattr(np.random.Generator, distribution):
+            raise ValueError(f"numpy.random.Generator has no distribution {distribution!r}")
+        self.nodes[name] = ('random', distribution, params)
+        return name
+
+    def deterministic(self, name, func, *parents):
+        """
+        Add a node computed from earlier nodes.
+
+        Args:
+            name: Node name
+            func: Vectorized function called with the parents' arrays, in order
+            *parents: Names of the nodes passed to func
+
+        Returns:
+            The node name, for use as a parent
+        """
+        self._check_parents(name, parents)
+        self.nodes[name] = ('deterministic', func, parents)
+        return name
+
+    def draw(self, rng, size):
+        """
+        Draw every node once for a batch of simulations.
+
+        Args:
+            rng: numpy.random.Generator to draw from
+            size: Number of simulations in the batch
+
+        Returns:
+            Dictionary of node name -> array of length size
+        """
+        values = {}
+        for name, (kind, func, args) in self.nodes.items():
+            if kind == 'deterministic':
+                value = func(*(values[parent] for parent in args))
+            else:
+                params = {key: values[value] if isinstance(value, str) and value in values else value
+                          for key, value in args.items()}
+                if callable(func):
+                    value = func(rng, size, **params)
+                else:
+                    value = getattr(rng, func)(size=size, **params)
+            values[name] = np.broadcast_to(value, (size,)) if np.ndim(value) == 0 else value
+        return values
+
+    def sample(self, size, seed=None):
+        """
+        Draw a batch of simulations into memory.
+
+        Args:
+            size: Number of simulations
+            seed: Seed for numpy.random.default_rng (None for a fresh one)
+
+        Returns:
+            Dictionary of node name -> array of length size
+        """
+        return self.draw(np.random.default_rng(seed), size)
+
+    def run(self, draws, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+            events=None, histograms=None, nodes=None):
+        """
+        Simulate many draws in memory-bounded chunks, in parallel.
+
+        Args:
+            draws: Total number of simulations
+            seed: Root seed; chunk i draws from the i-th SeedSequence spawned
+                from it, so results are reproducible for any number of workers
+            chunk_size: Simulations per chunk (bounds memory per worker)
+            workers: Worker processes (default: one per CPU; 1 runs in this process)
+            events: Dictionary of event name -> function(values) returning a
+                boolean array; the probability of each event is estimated
+            histograms: Integer nodes whose value counts are kept
+            nodes: Nodes to summarize (default: all numeric nodes)
+
+        Returns:
+            Simulation summary with 'draws', 'seconds', 'seed' and per-node
+            'nodes' (mean, std, min, max), 'events' (probability) and
+            'histograms' (value -> probability) dictionaries
+        """
+        seed_sequence, chunks = split_into_chunks(draws, chunk_size, seed)
+        tasks = [(self, chunk_seed, size, events, histograms, nodes) for chunk_seed, size in chunks]
+        start = time.perf_counter()
+        total = map_chunks(summarize_chunk, tasks, workers, merge_summaries)
+        return finish_summary(total, time.perf_counter() - start, seed_sequence.entropy)
+
+def split_into_chunks(draws, chunk_size, seed=None):
+    """
+    Split a simulation into chunks, each with its own independent random stream.
+
+    Args:
+        draws: Total number of simulations
+        chunk_size: Simulations per chunk
+        seed: Root seed (None for fresh entropy)
+
+    Returns:
+        Tuple of (root SeedSequence, list of (SeedSequence, chunk size) pairs)
+    """
+    seed_sequence = np.random.SeedSequence(seed)
+    sizes = [chunk_size] * (draws // chunk_size)
+    if draws % chunk_size:
+        sizes.append(draws % chunk_size)
+    return seed_sequence, list(zip(seed_sequence.spawn(len(sizes)), sizes))
+
+def map_chunks(func, tasks, workers, merge):
+    """
+    Run func over chunk tasks on a process pool and merge the results.
+
+    Results are merged in task order whatever the number of workers, so a
+    seeded run gives the same answer on any machine.
+
+    Args:
+        func: Module-level function taking one task
+        tasks: Picklable task arguments, one per chunk
+        workers: Worker processes (default: one per CPU; 1 runs in this process)
+        merge: Function combining an iterable of results into one
+
+    Returns:
+        The merged result
+    """
+    workers = min(workers or os.cpu_count(), len(tasks)) or 1
+    if workers == 1:
+        return merge(map(func, tasks))
+
+    executor_class = ProcessPoolExecutor
+    try:
+        pickle.dumps(tasks[0])
+    except (pickle.PicklingError, AttributeError, TypeError):
+        # Lambdas and local functions cannot be sent to other processes;
+        # NumPy releases the GIL for most array work, so threads still help
+        print("Warning: Model cannot be pickled (lambdas?); using threads instead of processes")
+        executor_class = ThreadPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        return merge(executor.map(func, tasks))
+
+def summarize_chunk(task):
+    """
+    Draw one chunk and reduce it to mergeable sums.
+
+    Args:
+        task: (model, SeedSequence, size, events, histograms, nodes) tuple
+
+    Returns:
+        Dictionary with the chunk's draw count and per-node, per-event and
+        histogram partial sums
+    """
+    model, seed_sequence, size, events, histograms, nodes = task
+    values = model.draw(np.random.default_rng(seed_sequence), size)
+    summary = {'draws': size, 'nodes': {}, 'events': {}, 'histograms': {}}
+
+    for name in nodes or values:
+        column = np.asarray(values[name])
+        if column.dtype.kind not in 'biuf':
+            continue
+        mean = column.mean(dtype=np.float64)
+        summary['nodes'][name] = {
+            'mean': mean,
+            # Sum of squared deviations; merged with Chan et al.'s pairwise formula
+            'm2': float(np.square(column - mean, dtype=np.float64).sum()),
+            'min': column.min().item(),
+            'max': column.max().item(),
+        }
+    for name, func in (events or {}).items():
+        summary['events'][name] = int(np.count_nonzero(func(values)))
+    for name in histograms or []:
+        column = np.asarray(values[name])
+        if column.dtype.kind == 'b':
+            column = column.astype(np.int8)
+        if column.dtype.kind not in 'iu':
+            raise ValueError(f"Histogram node {name!r} is not integer valued")
+        low = int(column.min())
+        if int(column.max()) - low >= MAX_HISTOGRAM_VALUES:
+            raise ValueError(f"Histogram node {name!r} has more than {MAX_HISTOGRAM_VALUES} distinct values")
+        counts = np.bincount(column - low)
+        summary['histograms'][name] = Counter({low + value: int(count)
+                                               for value, count in enumerate(counts) if count})
+    return summary
+
+def merge_summaries(partials):
+    """Combine chunk summaries (in any order) into one."""
+    total = None
+    for part in partials:
+        if total is None:
+            total = part
+            continue
+        n_a, n_b = total['draws'], part['draws']
+        n = n_a + n_b
+        for name, b in part['nodes'].items():
+            a = total['nodes'][name]
+            delta = b['mean'] - a['mean']
+            a['m2'] += b['m2'] + delta * delta * n_a * n_b / n
+            a['mean'] += delta * n_b / n
+            a['min'] = min(a['min'], b['min'])
+            a['max'] = max(a['max'], b['max'])
+        for name, count in part['events'].items():
+            total['events'][name] += count
+        for name, counts in part['histograms'].items():
+            total['histograms'][name].update(counts)
+        total['draws'] = n
+    return total
+
+def finish_summary(total, seconds, seed):
+    """Turn merged sums into means, standard deviations and probabilities."""
+    if total is None:
+        return {'draws': 0, 'seconds': seconds, 'seed': seed, 'nodes': {}, 'events': {}, 'histograms': {}}
+    n = total['draws']
+    return {
+        'draws': n,
+        'seconds': seconds,
+        'seed': seed,
+        'nodes': {name: {'mean': float(stats['mean']),
+                         'std': float(np.sqrt(stats['m2'] / (n - 1))) if n > 1 else 0.0,
+                         'min': stats['min'],
+                         'max': stats['max']}
+                  for name, stats in total['nodes'].items()},
+        'events': {name: count / n for name, count in total['events'].items()},
+        'histograms': {name: {value: count / n for value, count in sorted(counts.items())}
+                       for name, counts in total['histograms'].items()},
+    }
+
+class _Bumped:
+    """Passengers over capacity; a picklable callable for overbooking_model()."""
+
+    def __init__(self, seats):
+        self.seats = seats
+
+    def __call__(self, passengers):
+        return np.maximum(passengers - self.seats, 0)
+
+def overbooking_model(tickets=3, seats=3, low=0.5, high=1.0):
+    """
+    The XYZ Airlines model: an uncertain show-up probability, then passengers.
+
+    Args:
+        tickets: Tickets sold per flight
+        seats: Seats on the plane
+        low: Lowest show-up probability
+        high: Highest show-up probability
+
+    Returns:
+        GenerativeModel with nodes p, passengers and bumped
+    """
+    model = GenerativeModel()
+    model.random('p', 'uniform', low=low, high=high)
+    model.random('passengers', 'binomial', n=tickets, p='p')
+    # A callable object rather than a lambda, so the model can go to worker processes
+    model.deterministic('bumped', _Bumped(seats), 'passengers')
+    return model
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the XYZ Airlines overbooking model.")
+    parser.add_argument('--draws', type=int, default=10**7,
+                        help="number of simulated flights (default: 10,000,000)")
+    parser.add_argument('--tickets', type=int, default=3,
+                        help="tickets sold per flight (default: 3)")
+    parser.add_argument('--seats', type=int, default=3,
+                        help="seats per flight (default: 3)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"simulations per chunk (default: {DEFAULT_CHUNK_SIZE:,})")
+    parser.add_argument('--seed', type=int, default=111,
+                        help="random seed (default: 111)")
+    args = parser.parse_args()
+
+    model = overbooking_model(args.tickets, args.seats)
+    summary = model.run(args.draws, seed=args.seed, chunk_size=args.chunk_size, workers=args.workers,
+                        histograms=['passengers'])
+    bumped = summary['nodes']['bumped']
+    print(f"Simulated {summary['draws']:,} flights in {summary['seconds']:.2f}s (seed {summary['seed']})")
+    print(f"Expected passengers: {summary['nodes']['passengers']['mean']:.4f}")
+    print(f"Expected bumped passengers: {bumped['mean']:.4f}")
+    overbooked = sum(probability for value, probability in summary['histograms']['passengers'].items()
+                     if value > args.seats)
+    print(f"Probability of bumping someone: {overbooked:.4f}")
+    print("Passengers per flight:")
+    for value, probability in summary['histograms']['passengers'].items():
+        print(f"  {value}: {probability:.4f}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
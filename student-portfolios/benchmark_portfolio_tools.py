@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Student Portfolio Tools
+
+Builds synthetic student-portfolios trees (configurable number of students,
+README size, images per student, share of students with images and image
+resolution) plus a synthetic GitHub username roster, then times each stage
+of the portfolio tools:
+
+- scan: listing the student folders (generate_portfolio_readme.py)
+- parse: reading and parsing every student README (portfolio_parser.py)
+- match: matching every student to a username (github_matcher.py)
+- render_cold / render_warm: generating the index without and with a manifest
+- resize: downscaling every image (../resize_images.py, needs Pillow)
+
+Usage: python benchmark_portfolio_tools.py [--students N ...] [--repeat N]
+                                           [--output FILE] [--baseline FILE]
+
+The defaults (small images for one student in ten, hardlinked to a single
+file) run in well under a minute; pass e.g. --image-size 1600x1200
+--image-students 1 to benchmark phone-sized photos for every student.
+
+Results are written as JSON (to stdout unless --output is given). With
+--baseline, the median time of each stage is compared against an earlier
+result file and the exit status is 1 if any stage got more than
+--tolerance slower (and at least ABSOLUTE_TOLERANCE seconds slower).
+"""
+
+import io
+import os
+import sys
+import json
+import random
+import shutil
+import string
+import argparse
+import platform
+import statistics
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from generate_portfolio_readme import (MANIFEST_FILENAME, THUMBNAIL_DIRNAME, scan_student_dirs,
+                                       write_portfolio_readme)
+from github_matcher import UsernameIndex, find_best_github_match
+from portfolio_parser import parse_readme, read_readme
+
+# resize_images.py lives in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+try:
+    from PIL import Image
+    from resize_images import RESIZED_MARKER, find_oversized_images, resize_images
+except ImportError:  # Image stages are skipped without Pillow
+    Image = None
+
+STAGES = ['scan', 'parse', 'match', 'render_cold', 'render_warm', 'resize']
+# Slowdowns smaller than this many seconds are timer noise, whatever the percentage
+ABSOLUTE_TOLERANCE = 0.005
+
+FILLER_WORDS = ['portfolio', 'analytics', 'decision', 'model', 'data', 'simulation',
+                'chart', 'insight', 'project', 'student', 'uncertainty', 'value']
+
+
+def random_name(rng: random.Random) -> str:
+    """Return a random student folder name such as "MariaK"."""
+    first = rng.choice(string.ascii_uppercase) + ''.join(
+        rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8)))
+    return first + rng.choice(string.ascii_uppercase)
+
+
+def synthetic_readme(name: str, nickname: str, image_names: List[str], size: int,
+                     rng: random.Random) -> str:
+    """
+    Build a student README in the format the portfolio tools expect.
+
+    Args:
+        name: Student folder name
+        nickname: Value of the Nickname/Pseudonym field
+        image_names: Local image files to reference
+        size: Approximate size of the README in bytes; padded with filler text
+        rng: Random number generator
+
+    Returns:
+        README content
+    """
+    parts = [f"""# 👨‍🎓 Student Portfolio - {name}
+
+---
+
+## 📋 Student Information
+
+| **Field** | **Details** |
+|-----------|-------------|
+| **Nickname/Pseudonym** | {nickname} |
+| **Interesting Fact** | I have visited {rng.randint(2, 40)} countries. |
+| **Interesting Fact2** | My favourite number is {rng.randint(1, 1000)}. |
+
+---
+
+## 🖼️ Portfolio Images
+"""]
+    for i, image_name in enumerate(image_names):
+        parts.append(f"\n### Image {i + 1}\n![Image {i + 1} of {name}]({image_name})\n")
+
+    length = sum(len(part.encode('utf-8')) for part in parts)
+    filler = []
+    while length < size:
+        sentence = ' '.join(rng.choice(FILLER_WORDS) for _ in range(12)).capitalize() + '.\n'
+        filler.append(sentence)
+        length += len(sentence)
+    if filler:
+        parts.append('\n## Notes\n\n' + ''.join(filler))
+    return ''.join(parts)
+
+
+def make_synthetic_tree(root: Path, students: int, readme_size: int, images: int,
+                        image_size: Tuple[int, int], seed: int = 0,
+                        image_fraction: float = 1.0) -> List[Tuple[str, str]]:
+    """
+    Create a synthetic student-portfolios tree.
+
+    Args:
+        root: Directory to create the student folders in
+        students: Number of student folders
+        readme_size: Approximate size of each README in bytes
+        images: Local images per student (only written if Pillow is installed)
+        image_size: (width, height) of each image in pixels
+        seed: Seed for the random number generator
+        image_fraction: Share of the students (spread evenly) that get images
+
+    Returns:
+        (folder_name, nickname) pairs for the students created
+    """
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+
+    # One noise image, hardlinked into every student folder that gets images,
+    # keeps setup time and disk use down
+    image_bytes = None
+    shared_image = None
+    if images and Image is not None:
+        buffer = io.BytesIO()
+        Image.effect_noise(image_size, 64).convert('RGB').save(buffer, 'PNG')
+        image_bytes = buffer.getvalue()
+
+    created = []
+    names = set()
+    while len(created) < students:
+        name = random_name(rng)
+        if name in names:
+            continue
+        names.add(name)
+        nickname = name[:-1] if rng.random() < 0.7 else random_name(rng)[:-1]
+
+        student_dir = root / name
+        student_dir.mkdir()
+        # True for every 1/image_fraction-th student
+        with_images = int((len(created) + 1) * image_fraction) > int(len(created) * image_fraction)
+        image_names = [f"photo_{i + 1}.png" for i in range(images)] if image_bytes and with_images else []
+        for image_name in image_names:
+            image_path = student_dir / image_name
+            try:
+                if shared_image is None:
+                    raise OSError("no image to link to yet")
+                os.link(shared_image, image_path)
+            except OSError:  # First image, or a filesystem without hardlinks
+                image_path.write_bytes(image_bytes)
+                shared_image = image_path
+        (student_dir / 'README.md').write_text(
+            synthetic_readme(name, nickname, image_names, readme_size, rng), encoding='utf-8')
+        created.append((name, nickname))
+    return created
+
+
+def make_roster(students: List[Tuple[str, str]], size: int, seed: int = 0) -> List[str]:
+    """
+    Build a synthetic GitHub username roster.
+
+    About half of the usernames are variations of student names (lowercased,
+    with digits or suffixes added, as in real pull requests); the rest are
+    random.
+
+    Args:
+        students: (folder_name, nickname) pairs from make_synthetic_tree()
+        size: Number of usernames
+        seed: Seed for the random number generator
+
+    Returns:
+        List of unique usernames
+    """
+    rng = random.Random(seed)
+    roster = set()
+    for folder_name, nickname in students[:size // 2]:
+        base = rng.choice([folder_name, nickname]).lower()
+        roster.add(base + rng.choice(['', str(rng.randint(1, 999)), '-ops', '-dev', 'x']))
+    while len(roster) < size:
+        roster.add(''.join(rng.choice(string.ascii_lowercase + string.digits)
+                           for _ in range(rng.randint(5, 14))))
+    return sorted(roster)
+
+
+def time_stage(func: Callable[[], Dict[str, Any]], repeat: int,
+               setup: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """
+    Time a benchmark stage.
+
+    Args:
+        func: Runs the stage once and returns counters (items, bytes, ...)
+        repeat: Number of timed runs
+        setup: Called before every run, outside the timing
+
+    Returns:
+        Dictionary with the counters of the last run and the times in seconds
+    """
+    times = []
+    counters = {}
+    for _ in range(repeat):
+        if setup:
+            setup()
+        # The tools report progress on stdout, which is reserved for results
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            counters = func()
+            times.append(time.perf_counter() - start)
+    return dict(counters, seconds=times, best=min(times), median=statistics.median(times))
+
+
+def run_benchmarks(root: Path, students: List[Tuple[str, str]], roster: List[str],
+                   repeat: int, stages: List[str], workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Time the selected stages over one synthetic tree.
+
+    Args:
+        root: Synthetic student-portfolios directory
+        students: (folder_name, nickname) pairs in the tree
+        roster: Synthetic GitHub usernames
+        repeat: Number of timed runs per stage
+        stages: Names of the stages to run (see STAGES)
+        workers: Worker processes for the resize stage (default: one per CPU)
+
+    Returns:
+        Dictionary mapping stage names to time_stage() results
+    """
+    results = {}
+
+    def scan():
+        return {'items': sum(1 for _ in scan_student_dirs(root))}
+
+    def parse():
+        count = size = 0
+        for entry in scan_student_dirs(root):
+            content = read_readme(Path(entry.path) / 'README.md')
+            if content is not None:
+                parse_readme(content)
+                count += 1
+                size += len(content.encode('utf-8'))
+        return {'items': count, 'bytes': size}
+
+    def match():
+        index = UsernameIndex(roster)
+        matched = sum(1 for folder_name, nickname in students
+                      if find_best_github_match(folder_name, nickname, index)[0])
+        return {'items': len(students), 'usernames': len(roster), 'matched': matched}
+
+    def clear_generated():
+        (root / MANIFEST_FILENAME).unlink(missing_ok=True)
+        shutil.rmtree(root / THUMBNAIL_DIRNAME, ignore_errors=True)
+
+    def render():
+        out = io.StringIO()
+        count = write_portfolio_readme(root, out)
+        return {'items': count, 'bytes': len(out.getvalue().encode('utf-8'))}
+
+    def clear_resized():
+        for path in root.glob(f'*/*{RESIZED_MARKER}.*'):
+            path.unlink()
+
+    def resize():
+        images = find_oversized_images([root], 0)
+        summary = resize_images(images, workers=workers, cache_path=None)
+        return {'items': len(images), 'bytes': summary['original_bytes'],
+                'output_bytes': summary['new_bytes'], 'failed': summary['failed']}
+
+    if 'scan' in stages:
+        results['scan'] = time_stage(scan, repeat)
+    if 'parse' in stages:
+        results['parse'] = time_stage(parse, repeat)
+    if 'match' in stages:
+        results['match'] = time_stage(match, repeat)
+    if 'render_cold' in stages:
+        results['render_cold'] = time_stage(render, repeat, setup=clear_generated)
+    if 'render_warm' in stages:
+        with redirect_stdout(io.StringIO()):
+            render()  # Build the manifest the warm runs start from
+        results['render_warm'] = time_stage(render, repeat)
+    if 'resize' in stages:
+        if Image is None:
+            print("Warning: Pillow is not installed; skipping the resize stage", file=sys.stderr)
+        else:
+            results['resize'] = time_stage(resize, repeat, setup=clear_resized)
+    return results
+
+
+def compare_with_baseline(results: Dict[str, Any], baseline: Dict[str, Any],
+                          tolerance: float) -> List[str]:
+    """
+    Find stages that got slower than in a baseline result file.
+
+    Runs are matched on their student count; stages missing from either
+    side are ignored, as are slowdowns under ABSOLUTE_TOLERANCE seconds, so
+    millisecond stages do not fail on scheduler jitter.
+
+    Args:
+        results: Output of this run
+        baseline: Output of an earlier run
+        tolerance: Allowed slowdown as a fraction (0.25 = 25% slower)
+
+    Returns:
+        One message per regressed stage
+    """
+    baseline_runs = {run['students']: run['stages'] for run in baseline.get('runs', [])}
+    regressions = []
+    for run in results['runs']:
+        old_stages = baseline_runs.get(run['students'], {})
+        for stage, result in run['stages'].items():
+            if stage not in old_stages:
+                continue
+            old, new = old_stages[stage]['median'], result['median']
+            if new > old * (1 + tolerance) and new - old >= ABSOLUTE_TOLERANCE:
+                regressions.append(f"{stage} with {run['students']} students: "
+                                   f"{old:.4f}s -> {new:.4f}s ({(new / old - 1) * 100:+.0f}%)")
+    return regressions
+
+
+def main():
+    """Main function to run the benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmark the student portfolio tools on synthetic data.")
+    parser.add_argument('--students', type=int, nargs='+', default=[100, 1000],
+                        help="student counts to benchmark (default: 100 1000)")
+    parser.add_argument('--readme-size', type=int, default=2048,
+                        help="approximate README size in bytes (default: 2048)")
+    parser.add_argument('--images', type=int, default=2,
+                        help="images per student that has images (default: 2)")
+    parser.add_argument('--image-students', type=float, default=0.1, metavar='FRACTION',
+                        help="share of the students that have images (default: 0.1; 1 for all)")
+    parser.add_argument('--image-size', default='320x240',
+                        help="image resolution as WIDTHxHEIGHT (default: 320x240; "
+                             "use e.g. 1600x1200 for phone-sized photos)")
+    parser.add_argument('--usernames', type=int, default=None,
+                        help="usernames in the roster (default: one per student)")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES,
+                        help="stages to run (default: all)")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="timed runs per stage (default: 3)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes for the resize stage (default: one per CPU)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write the JSON results to this file instead of stdout")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown against --baseline as a fraction (default: 0.25)")
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.image_size.lower().split('x'))
+    results = {
+        'config': {
+            'readme_size': args.readme_size,
+            'images': args.images,
+            'image_students': args.image_students,
+            'image_size': [width, height],
+            'usernames': args.usernames,
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'pillow': Image is not None,
+        },
+        'runs': [],
+    }
+
+    for count in args.students:
+        with tempfile.TemporaryDirectory(prefix='portfolio-benchmark-') as tmp_dir:
+            root = Path(tmp_dir) / 'student-portfolios'
+            print(f"Benchmarking {count} students...", file=sys.stderr)
+            students = make_synthetic_tree(root, count, args.readme_size, args.images,
+                                           (width, height), args.seed, args.image_students)
+            roster = make_roster(students, args.usernames or count, args.seed)
+            stages = run_benchmarks(root, students, roster, args.repeat, args.stages, args.workers)
+            results['runs'].append({'students': count, 'stages': stages})
+            for stage, result in stages.items():
+                print(f"  {stage:<12} {result['median']:9.4f}s median "
+                      f"({result['items']} items)", file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.baseline:
+        try:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error reading baseline {args.baseline}: {e}", file=sys.stderr)
+            return 1
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"✗ Slower than baseline: {message}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -6,56 +6,112 @@ Student Portfolio README Generator
 This script automatically generates a README.md file for the student-portfolios folder
 by scanning subdirectories and extracting information from each student's README.md file.
 
-Usage: python generate_portfolio_readme.py
+Usage: python generate_portfolio_readme.py [--full] [--shard-by {letter,page}] [--page-size N]
+                                           [--changed-paths FILE] [--check-urls [{annotate,drop}]]
+                                           [--profile [FILE]]
+
+A manifest of each student's README (stat, content hash, extracted fields and
+rendered table row) is kept in the SQLite database .portfolio_manifest.sqlite
+so that unchanged portfolios are not re-parsed on the next run. Use --full to
+ignore it. Rows are streamed from the manifest in folder order into a
+temporary file that replaces README.md at the end, so memory use does not
+grow with the number of students.
+
+With --shard-by the table is split into pages under index/ (one per initial
+letter, or --page-size students each) and README.md only holds a table of
+contents; a page file is rewritten only when its content changes.
+
+With --changed-paths (a file, or - for stdin, listing paths relative to the
+repository root as `git diff --name-only` prints them) only the student
+folders named in it are re-scanned; every other row comes from the manifest.
+
+When Pillow is installed, the first two local images of each student are
+downscaled into .thumbnails/ (regenerated only when the source changes) and
+the index links those instead of the full-size photos. Image dimensions and
+formats are read from the file headers once and kept in the manifest, so
+images that are already small are linked directly and oversized ones are
+reported without reopening any file.
+
+--check-urls asks the servers of all external images whether they are
+still there and how big they are, concurrently (see url_check.py), and
+replaces dead, non-image or oversized ones with a warning link (annotate)
+or leaves them out (drop). Results are kept in the manifest and revalidated
+with their ETag/Last-Modified once they are a day old.
+
+--profile prints the time, calls and bytes of each stage (see profiling.py).
 """
 
+import io
 import os
-import re
+import sys
+import itertools
 import json
+import sqlite3
+import hashlib
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from git_metadata import load_git_metadata, run_git
+from portfolio_parser import parse_readme, read_readme
+from profiling import file_size, profile_session, text_size, written_size
+from url_check import check_urls, url_problem
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Thumbnails are optional; fall back to full-size images
+    Image = None
+
+MANIFEST_FILENAME = '.portfolio_manifest.sqlite'
+MANIFEST_VERSION = 7
+# Students processed together when encoding thumbnails and refreshing rows
+BATCH_SIZE = 500
 
+THUMBNAIL_DIRNAME = '.thumbnails'
 
-def extract_student_info(readme_path: Path) -> Dict[str, str]:
+# Sharded output: pages are written to index/ and README.md links to them
+INDEX_DIRNAME = 'index'
+DEFAULT_PAGE_SIZE = 500
+# Displayed at 150px wide (85px high for external images); render at 2x
+THUMBNAIL_SIZE = (300, 300)
+THUMBNAIL_QUALITY = 80
+# Images this small in a format browsers show are linked as they are
+WEB_IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+# Linked images at least this big are reported (resize_images.py's default --min-size)
+OVERSIZED_IMAGE_BYTES = 1024 * 1024
+# External images larger than this are flagged by --check-urls
+MAX_EXTERNAL_IMAGE_MB = 5.0
+
+
+def extract_student_info(readme_path: Path,
+                         listings: Optional[Dict[Path, Dict[str, os.DirEntry]]] = None) -> Dict[str, str]:
     """
     Extract student information from a README.md file.
     
     Args:
         readme_path: Path to the student's README.md file
+        listings: Directory listings cache for find_local_image()
         
     Returns:
         Dictionary containing extracted student information
     """
-    try:
-        with open(readme_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except Exception as e:
-        print(f"Warning: Could not read {readme_path}: {e}")
+    content = read_readme(readme_path)
+    if content is None:
         return {}
     
-    info = {}
-    
-    # Extract nickname/pseudonym
-    nickname_match = re.search(r'\*\*Nickname/Pseudonym\*\*\s*\|\s*([^|]+?)\s*\|', content)
-    if nickname_match:
-        info['nickname'] = nickname_match.group(1).strip()
-    
-    # Extract interesting facts
-    fact1_match = re.search(r'\*\*Interesting Fact\*\*\s*\|\s*([^|]+?)\s*\|', content)
-    if fact1_match:
-        info['fact1'] = fact1_match.group(1).strip()
-    
-    fact2_match = re.search(r'\*\*Interesting Fact2\*\*\s*\|\s*([^|]+?)\s*\|', content)
-    if fact2_match:
-        info['fact2'] = fact2_match.group(1).strip()
+    # Extract nickname/pseudonym and interesting facts in one pass
+    info, image_matches = parse_readme(content)
     
     # Extract student name from folder name
     info['folder_name'] = readme_path.parent.name
     
     # Extract image information
     images = []
-    # Look for markdown image syntax: ![alt text](filename)
-    image_matches = re.findall(r'!\[([^\]]*)\]\(([^)]+)\)', content)
+    image_refs = []
     
     for alt_text, filename in image_matches:
         # Handle both local files and external URLs
@@ -69,8 +125,9 @@ def extract_student_info(readme_path: Path) -> Dict[str, str]:
             })
         else:
             # Local file - check if it exists
-            image_path = readme_path.parent / filename
-            if image_path.exists():
+            image_refs.append(filename)
+            if find_local_image(readme_path.parent, filename, listings):
+                image_path = readme_path.parent / filename
                 images.append({
                     'alt': alt_text.strip(),
                     'filename': filename,
@@ -79,11 +136,141 @@ def extract_student_info(readme_path: Path) -> Dict[str, str]:
                 })
     
     info['images'] = images[:2]  # Limit to first 2 images
+    # All local references, including missing ones, so the manifest can
+    # notice when a referenced image is added or removed later
+    info['image_refs'] = image_refs
     
     return info
 
 
-# Removed thumbnail generation function - using simple HTML sizing instead
+def thumbnail_format() -> Tuple[str, str]:
+    """Return the (Pillow format, file extension) used for thumbnails."""
+    if features.check('webp'):
+        return 'WEBP', '.webp'
+    return 'JPEG', '.jpg'
+
+
+def make_thumbnail(source: Path, target: Path, image_format: str) -> Optional[str]:
+    """
+    Write a downscaled copy of an image.
+    
+    Args:
+        source: Path to the full-size image
+        target: Path to write the thumbnail to
+        image_format: Pillow format name returned by thumbnail_format()
+        
+    Returns:
+        None on success, or an error message
+    """
+    try:
+        with Image.open(source) as img:
+            # JPEGs decode straight at a reduced scale
+            img.draft('RGB', THUMBNAIL_SIZE)
+            # Phone photos are often stored sideways with an EXIF Orientation tag
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+            has_alpha = img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+            mode = 'RGBA' if has_alpha and image_format != 'JPEG' else 'RGB'
+            if img.mode != mode:
+                img = img.convert(mode)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            img.save(target, image_format, quality=THUMBNAIL_QUALITY)
+        return None
+    except Exception as e:
+        return f"{source}: {e}"
+
+
+def refresh_thumbnails(conn: sqlite3.Connection, portfolio_dir: Path, sources: List[str],
+                       run: int, executor: Optional[ProcessPoolExecutor]) -> Tuple[Dict[str, str], int]:
+    """
+    Make sure a batch of source images have up-to-date thumbnails.
+    
+    Thumbnails are named after the source's content hash, so a changed image
+    gets a new URL. The manifest's images table records each source's stat,
+    hash and header (dimensions and format) so unchanged images are neither
+    re-hashed, re-opened nor re-encoded; images that already fit in
+    THUMBNAIL_SIZE are linked as they are, and the rest are encoded in
+    parallel.
+    
+    Args:
+        conn: Open manifest database
+        portfolio_dir: Path to the student-portfolios directory
+        sources: Image paths relative to portfolio_dir
+        run: Current run number, recorded against every image seen
+        executor: Process pool for encoding, or None if Pillow is not installed
+        
+    Returns:
+        Tuple of (thumbnails, encoded): a dictionary mapping source paths to
+        thumbnail paths (both relative to portfolio_dir), empty if Pillow is
+        not installed, and the number of thumbnails encoded
+    """
+    if executor is None:
+        return {}, 0
+    
+    image_format, extension = thumbnail_format()
+    thumbnails = {}
+    jobs = []
+    for source in sources:
+        source_path = portfolio_dir / source
+        signature = file_signature(source_path)
+        if signature is None:
+            continue
+        
+        cached = conn.execute('SELECT mtime_ns, size, sha256, width, height, format FROM images '
+                              'WHERE source = ?', (source,)).fetchone()
+        if cached and cached[0] == signature[0] and cached[1] == signature[1]:
+            sha256, width, height, source_format = cached[2:]
+        else:
+            sha256 = hash_file(source_path)
+            width, height, source_format = read_image_header(source_path)
+        
+        if (source_format in WEB_IMAGE_FORMATS and
+                width <= THUMBNAIL_SIZE[0] and height <= THUMBNAIL_SIZE[1]):
+            thumbnail = None  # Already thumbnail-sized
+        else:
+            thumbnail = Path(THUMBNAIL_DIRNAME, Path(source).parent,
+                             f"{Path(source).stem}-{sha256[:12]}{extension}").as_posix()
+            if not (portfolio_dir / thumbnail).exists():
+                jobs.append((source, thumbnail))
+            thumbnails[source] = thumbnail
+        conn.execute('INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                     (source, signature[0], signature[1], sha256, thumbnail,
+                      width, height, source_format, run))
+    
+    if jobs:
+        results = executor.map(make_thumbnail,
+                               [portfolio_dir / source for source, _ in jobs],
+                               [portfolio_dir / thumbnail for _, thumbnail in jobs],
+                               [image_format] * len(jobs))
+        for (source, _), error in zip(jobs, results):
+            if error:
+                print(f"Warning: Could not create thumbnail for {error}")
+                conn.execute('UPDATE images SET thumbnail = NULL WHERE source = ?', (source,))
+                del thumbnails[source]
+    
+    return thumbnails, len(jobs)
+
+
+def prune_thumbnails(conn: sqlite3.Connection, portfolio_dir: Path,
+                     folders: Optional[Set[str]] = None) -> None:
+    """
+    Delete thumbnails that no image in the manifest links to any more.
+    
+    Args:
+        conn: Open manifest database
+        portfolio_dir: Path to the student-portfolios directory
+        folders: Only look at these students' thumbnails (default: all)
+    """
+    thumbnail_dir = portfolio_dir / THUMBNAIL_DIRNAME
+    tops = [thumbnail_dir] if folders is None else [thumbnail_dir / folder for folder in sorted(folders)]
+    for root, _, files in (walked for top in tops for walked in os.walk(top, topdown=False)):
+        for name in files:
+            path = Path(root, name)
+            thumbnail = path.relative_to(portfolio_dir).as_posix()
+            if not conn.execute('SELECT 1 FROM images WHERE thumbnail = ?', (thumbnail,)).fetchone():
+                path.unlink()
+        if root != str(thumbnail_dir) and not os.listdir(root):
+            os.rmdir(root)
 
 
 def load_github_mappings(portfolio_dir: Path) -> Dict[str, str]:
@@ -119,35 +306,584 @@ def load_github_mappings(portfolio_dir: Path) -> Dict[str, str]:
     return github_mappings
 
 
-def generate_portfolio_readme(portfolio_dir: Path) -> str:
+def list_directory(directory: Path) -> Dict[str, os.DirEntry]:
+    """List a directory with a single scandir call (empty if it cannot be read)."""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name: entry for entry in entries}
+    except OSError:
+        return {}
+
+
+def find_local_image(student_dir: Path, filename: str,
+                     listings: Optional[Dict[Path, Dict[str, os.DirEntry]]] = None) -> Optional[os.DirEntry]:
     """
-    Generate the main portfolio README.md content.
+    Look up an image referenced from a student's README.
+    
+    Each directory is listed once and kept in listings, so checking all of a
+    student's images costs one scandir instead of one stat per image. Names
+    are matched case-sensitively, as GitHub does.
+    
+    Args:
+        student_dir: Path to the student's folder
+        filename: Image path as written in the README
+        listings: Directory listings from earlier lookups, updated in place
+        
+    Returns:
+        The image's directory entry, or None if it does not exist
+    """
+    if listings is None:
+        listings = {}
+    image_path = student_dir / filename
+    directory = image_path.parent
+    if directory not in listings:
+        listings[directory] = list_directory(directory)
+    return listings[directory].get(image_path.name)
+
+
+def read_image_header(path: Path) -> Tuple[Optional[int], Optional[int], Optional[str]]:
+    """
+    Read an image's dimensions and format without decoding its pixels.
+    
+    Args:
+        path: Path to the image
+        
+    Returns:
+        Tuple of (width, height, Pillow format name), all None if the file
+        is not a readable image
+    """
+    try:
+        # Image.open() only parses the header; pixels load on first access
+        with Image.open(path) as img:
+            return img.width, img.height, img.format
+    except Exception:
+        return None, None, None
+
+
+def file_signature(path: Path) -> Optional[List[int]]:
+    """
+    Return a cheap change signature for a file.
+    
+    Args:
+        path: Path to the file
+        
+    Returns:
+        [mtime_ns, size] for an existing file, or None if it does not exist
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def hash_file(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def open_manifest(portfolio_dir: Path, full: bool = False) -> sqlite3.Connection:
+    """
+    Open the incremental build manifest, creating it if needed.
     
     Args:
         portfolio_dir: Path to the student-portfolios directory
+        full: Discard everything cached by previous runs
         
     Returns:
-        String content for the README.md file
+        Connection to the manifest database; a manifest from another
+        manifest version is discarded
+    """
+    manifest_file = portfolio_dir / MANIFEST_FILENAME
+    try:
+        conn = sqlite3.connect(manifest_file)
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+    except sqlite3.DatabaseError as e:
+        print(f"Warning: Ignoring unreadable manifest {manifest_file}: {e}")
+        manifest_file.unlink()
+        conn = sqlite3.connect(manifest_file)
+        version = 0
+    
+    if full or version != MANIFEST_VERSION:
+        conn.executescript('''
+            DROP TABLE IF EXISTS students;
+            DROP TABLE IF EXISTS images;
+            DROP TABLE IF EXISTS settings;
+            DROP TABLE IF EXISTS urls;
+        ''')
+    conn.executescript(f'''
+        PRAGMA user_version = {MANIFEST_VERSION};
+        CREATE TABLE IF NOT EXISTS students (
+            folder TEXT PRIMARY KEY,
+            entry TEXT NOT NULL,
+            row TEXT,
+            run INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS images (
+            source TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            thumbnail TEXT,
+            width INTEGER,
+            height INTEGER,
+            format TEXT,
+            run INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS images_thumbnail ON images (thumbnail);
+        CREATE TABLE IF NOT EXISTS settings (
+            name TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS urls (
+            url TEXT PRIMARY KEY,
+            result TEXT NOT NULL
+        );
+    ''')
+    return conn
+
+
+def image_signatures(student_dir: Path, image_refs: List[str],
+                     listings: Optional[Dict[Path, Dict[str, os.DirEntry]]] = None) -> Dict[str, Optional[int]]:
+    """
+    Record the state of every local image a README references.
+    
+    Only existence and size are kept: a fresh checkout resets every mtime,
+    and hashing multi-MB photos would cost more than re-parsing the README.
+    
+    Args:
+        student_dir: Path to the student's folder
+        image_refs: Local image filenames referenced by the README
+        listings: Directory listings cache for find_local_image()
+        
+    Returns:
+        Dictionary mapping filename to size in bytes (None if missing)
+    """
+    if listings is None:
+        listings = {}
+    signatures = {}
+    for filename in image_refs:
+        entry = find_local_image(student_dir, filename, listings)
+        try:
+            signatures[filename] = entry.stat().st_size if entry else None
+        except OSError:
+            signatures[filename] = None
+    return signatures
+
+
+def info_to_json(info: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert extracted student info into a JSON-serializable dictionary."""
+    data = dict(info)
+    data['images'] = [
+        dict(img, path=str(img['path']) if img['path'] is not None else None)
+        for img in info.get('images', [])
+    ]
+    return data
+
+
+def info_from_json(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of info_to_json()."""
+    info = dict(data)
+    info['images'] = [
+        dict(img, path=Path(img['path']) if img['path'] is not None else None)
+        for img in data.get('images', [])
+    ]
+    return info
+
+
+def cached_entry_is_fresh(entry: Dict[str, Any], readme_path: Path, readme_signature: List[int],
+                          listings: Optional[Dict[Path, Dict[str, os.DirEntry]]] = None) -> bool:
     """
-    students = []
+    Check whether a manifest entry still describes a student's folder.
     
-    # Load GitHub mappings
-    github_mappings = load_github_mappings(portfolio_dir)
+    The README is compared by mtime and size first; if only the mtime moved
+    (e.g. after a fresh checkout) the content hash decides. Referenced images
+    are compared by existence and size.
     
-    # Scan for student directories
-    for item in portfolio_dir.iterdir():
-        if item.is_dir() and not item.name.startswith('.'):
-            readme_path = item / 'README.md'
-            if readme_path.exists():
-                student_info = extract_student_info(readme_path)
-                if student_info:
-                    students.append(student_info)
+    Args:
+        entry: Manifest entry for the student
+        readme_path: Path to the student's README.md file
+        readme_signature: Current [mtime_ns, size] of the README
+        listings: Directory listings cache for find_local_image()
+        
+    Returns:
+        True if the cached fields and row can be reused
+    """
+    readme = entry.get('readme', {})
+    if readme.get('size') != readme_signature[1]:
+        return False
     
-    # Sort students alphabetically by folder name
-    students.sort(key=lambda x: x['folder_name'])
+    if readme.get('mtime_ns') != readme_signature[0]:
+        try:
+            if hash_file(readme_path) != readme.get('sha256'):
+                return False
+        except OSError:
+            return False
+        readme['mtime_ns'] = readme_signature[0]
     
-    # Generate the README content
-    content = """# 👨‍🎓 Student Portfolios
+    images = entry.get('images', {})
+    return image_signatures(readme_path.parent, list(images), listings) == images
+
+
+def external_image_urls(student: Dict[str, Any]) -> List[str]:
+    """Return the URLs of the student's external images."""
+    return [img['filename'] for img in student.get('images', []) if img.get('is_external', False)]
+
+
+def local_image_sources(student: Dict[str, Any]) -> List[str]:
+    """Return the student's local images as paths relative to the portfolio directory."""
+    return [
+        os.path.normpath(f"{student['folder_name']}/{img['filename']}").replace(os.sep, '/')
+        for img in student.get('images', [])
+        if not img.get('is_external', False)
+    ]
+
+
+def format_timestamp(timestamp: Optional[int], fmt: str) -> Optional[str]:
+    """Format a Unix timestamp in UTC, passing None through."""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(fmt)
+
+
+def render_student_row(student: Dict[str, Any], github_username: Optional[str],
+                       thumbnails: Optional[Dict[str, str]] = None,
+                       last_updated: Optional[str] = None, link_prefix: str = '',
+                       image_problems: Optional[Dict[str, str]] = None,
+                       drop_problem_images: bool = False) -> str:
+    """
+    Render one student's row of the portfolio table.
+    
+    Args:
+        student: Dictionary returned by extract_student_info()
+        github_username: The student's GitHub username, if known
+        thumbnails: Mapping from local_image_sources() paths to thumbnail paths
+        last_updated: Date of the last commit to the student's folder
+        link_prefix: Prefix for local links, for rows on pages outside portfolio_dir
+        image_problems: Mapping from external image URL to what is wrong with it
+            (see check_external_images()); those images become warning links
+        drop_problem_images: Leave images with problems out instead
+        
+    Returns:
+        Markdown table row, including the trailing newline
+    """
+    nickname = student.get('nickname', 'N/A')
+    fact1 = student.get('fact1', 'N/A')
+    fact2 = student.get('fact2', 'N/A')
+    folder_name = student['folder_name']
+    
+    # Truncate facts if they're too long
+    fact1_short = fact1[:50] + "..." if len(fact1) > 50 else fact1
+    fact2_short = fact2[:50] + "..." if len(fact2) > 50 else fact2
+    
+    # Combine facts for display
+    facts_display = f"{fact1_short}<br>{fact2_short}"
+    
+    # Generate GitHub link
+    if github_username:
+        github_link = f"[@{github_username}](https://github.com/{github_username})"
+    else:
+        github_link = "N/A"
+    
+    # Generate thumbnail HTML
+    thumbnails = thumbnails or {}
+    image_problems = image_problems or {}
+    thumbnails_html = ""
+    if 'images' in student and student['images']:
+        sources = iter(local_image_sources(student))
+        for img in student['images']:
+            if img.get('is_external', False) and img['filename'] in image_problems:
+                # Dead, not an image or too big: don't make every visitor load it
+                if not drop_problem_images:
+                    thumbnails_html += f'<a href="{img["filename"]}" title="{img["alt"]}">⚠️ {image_problems[img["filename"]]}</a> '
+            elif img.get('is_external', False):
+                # External URL - use the full URL with size parameters
+                # GitHub doesn't support resizing external URLs, so we'll use inline styles
+                thumbnails_html += f'<img src="{img["filename"]}" alt="{img["alt"]}" title="{img["alt"]}" width="150" style="max-height: 85px; object-fit: contain; margin: 2px;">'
+            else:
+                # Local file - link the generated thumbnail if there is one, else the original
+                # GitHub will respect the width attribute and auto-adjust height
+                src = link_prefix + thumbnails.get(next(sources), f'{folder_name}/{img["filename"]}')
+                thumbnails_html += f'<img src="{src}" alt="{img["alt"]}" title="{img["alt"]}" width="150">'
+    
+    if not thumbnails_html:
+        thumbnails_html = "No images"
+    
+    return f"| {folder_name} | {nickname} | {facts_display} | [View Portfolio]({link_prefix}{folder_name}/README.md) | {github_link} | {last_updated or 'N/A'} | {thumbnails_html} |\n"
+
+
+def scan_student_dirs(portfolio_dir: Path) -> Iterator[os.DirEntry]:
+    """Yield the student folders of the portfolio directory, in directory order."""
+    with os.scandir(portfolio_dir) as entries:
+        for entry in entries:
+            if not entry.name.startswith('.') and entry.name != INDEX_DIRNAME and entry.is_dir():
+                yield entry
+
+
+def changed_student_folders(portfolio_dir: Path, paths: Iterable[str]) -> Optional[Set[str]]:
+    """
+    Work out which student folders a list of changed paths touches.
+    
+    Args:
+        portfolio_dir: Path to the student-portfolios directory
+        paths: Changed paths relative to the repository root, as printed by
+            `git diff --name-only` (relative to portfolio_dir outside git)
+        
+    Returns:
+        Set of student folder names, or None if a change outside the student
+        folders (the generator, the GitHub mapping file, ...) needs a full scan
+    """
+    prefix = (run_git(portfolio_dir, ['rev-parse', '--show-prefix']) or '').strip()
+    
+    folders = set()
+    for path in paths:
+        path = path.strip().replace('\\', '/')
+        if not path or not path.startswith(prefix):
+            continue  # Outside student-portfolios
+        parts = path[len(prefix):].split('/')
+        
+        if len(parts) == 1:
+            if parts[0] != 'README.md':  # The generated index itself
+                return None
+        elif not parts[0].startswith('.') and parts[0] != INDEX_DIRNAME:
+            folders.add(parts[0])
+    return folders
+
+
+def update_manifest(conn: sqlite3.Connection, portfolio_dir: Path, run: int,
+                    folders: Optional[Set[str]] = None) -> Tuple[int, int]:
+    """
+    Bring the manifest's students table up to date with the portfolio folders.
+    
+    Only students whose README or referenced images changed are re-parsed.
+    Every student seen is stamped with the current run number.
+    
+    Args:
+        conn: Open manifest database
+        portfolio_dir: Path to the student-portfolios directory
+        run: Current run number
+        folders: Only look at these student folders (default: scan them all)
+        
+    Returns:
+        Tuple of (students found, students re-parsed)
+    """
+    if folders is None:
+        items = ((item.name, Path(item.path)) for item in scan_student_dirs(portfolio_dir))
+    else:
+        items = ((folder, portfolio_dir / folder) for folder in sorted(folders)
+                 if (portfolio_dir / folder).is_dir())
+    
+    found = reparsed = 0
+    for name, path in items:
+        readme_path = path / 'README.md'
+        readme_signature = file_signature(readme_path)
+        if readme_signature is None:
+            continue
+        
+        # One listing of the folder answers every image lookup below
+        listings = {}
+        cached = conn.execute('SELECT entry FROM students WHERE folder = ?', (name,)).fetchone()
+        entry = json.loads(cached[0]) if cached else None
+        if entry and cached_entry_is_fresh(entry, readme_path, readme_signature, listings):
+            # The README's mtime may have been refreshed from its hash
+            conn.execute('UPDATE students SET entry = ?, run = ? WHERE folder = ?',
+                         (json.dumps(entry), run, name))
+        else:
+            student_info = extract_student_info(readme_path, listings)
+            reparsed += 1
+            if not student_info:
+                continue
+            entry = {
+                'readme': {
+                    'mtime_ns': readme_signature[0],
+                    'size': readme_signature[1],
+                    'sha256': hash_file(readme_path),
+                },
+                'images': image_signatures(path, student_info['image_refs'], listings),
+                'info': info_to_json(student_info),
+            }
+            conn.execute('INSERT OR REPLACE INTO students VALUES (?, ?, NULL, ?)',
+                         (name, json.dumps(entry), run))
+        found += 1
+    
+    # Forget students whose folders were removed
+    if folders is None:
+        conn.execute('DELETE FROM students WHERE run != ?', (run,))
+    else:
+        conn.executemany('DELETE FROM students WHERE folder = ? AND run != ?',
+                         [(folder, run) for folder in folders])
+    return found, reparsed
+
+
+def student_batches(conn: sqlite3.Connection,
+                    folders: Optional[Set[str]] = None) -> Iterator[List[Tuple[str, str, Optional[str]]]]:
+    """
+    Yield (folder, entry, row) manifest records in batches of BATCH_SIZE, in folder order.
+    
+    Uses keyset pagination so no cursor stays open while the caller updates rows.
+    
+    Args:
+        conn: Open manifest database
+        folders: Only these students (default: all)
+    """
+    if folders is not None:
+        ordered = sorted(folders)
+        for start in range(0, len(ordered), BATCH_SIZE):
+            batch = [conn.execute('SELECT folder, entry, row FROM students WHERE folder = ?',
+                                  (folder,)).fetchone()
+                     for folder in ordered[start:start + BATCH_SIZE]]
+            yield [record for record in batch if record]
+        return
+    
+    last_folder = ''
+    while True:
+        batch = conn.execute('SELECT folder, entry, row FROM students WHERE folder > ? '
+                             'ORDER BY folder LIMIT ?', (last_folder, BATCH_SIZE)).fetchall()
+        if not batch:
+            return
+        last_folder = batch[-1][0]
+        yield batch
+
+
+def check_external_images(conn: sqlite3.Connection,
+                          max_bytes: int) -> Tuple[Dict[str, str], Set[str]]:
+    """
+    Check every student's external images and find the rows whose verdict changed.
+    
+    All URLs are checked concurrently by url_check.check_urls(); results are
+    kept in the manifest's urls table, so recent ones are reused and older
+    ones are revalidated with a conditional request.
+    
+    Args:
+        conn: Open manifest database
+        max_bytes: Largest acceptable external image
+        
+    Returns:
+        Tuple of (URL -> problem for every external image with one, folders
+        with an image whose problem changed since the last check)
+    """
+    folders_by_url = {}
+    for batch in student_batches(conn):
+        for folder, entry, _ in batch:
+            for url in external_image_urls(json.loads(entry)['info']):
+                folders_by_url.setdefault(url, set()).add(folder)
+    
+    cache = {url: json.loads(result) for url, result in conn.execute('SELECT url, result FROM urls')}
+    previous = {url: url_problem(result, max_bytes) for url, result in cache.items()}
+    results = check_urls(folders_by_url, cache)
+    
+    conn.execute('DELETE FROM urls')
+    conn.executemany('INSERT INTO urls VALUES (?, ?)',
+                     [(url, json.dumps(result)) for url, result in results.items()])
+    
+    problems = {}
+    changed = set()
+    for url, result in results.items():
+        problem = url_problem(result, max_bytes)
+        if problem:
+            problems[url] = problem
+        if problem != previous.get(url):
+            changed |= folders_by_url[url]
+    if results:
+        print(f"Checked {len(results)} external images: {len(problems)} with problems")
+    return problems, changed
+
+
+def refresh_rows(conn: sqlite3.Connection, portfolio_dir: Path, run: int,
+                 github_mappings: Dict[str, str], git_metadata: Dict[str, Any],
+                 link_prefix: str = '', folders: Optional[Set[str]] = None,
+                 image_problems: Optional[Dict[str, str]] = None,
+                 drop_problem_images: bool = False) -> None:
+    """
+    Update thumbnails and re-render the table rows whose inputs changed.
+    
+    Students are processed in batches of BATCH_SIZE, in folder order, so only
+    one batch of entries is held in memory at a time.
+    
+    Args:
+        conn: Open manifest database
+        portfolio_dir: Path to the student-portfolios directory
+        run: Current run number
+        github_mappings: Dictionary returned by load_github_mappings()
+        git_metadata: Dictionary returned by load_git_metadata()
+        link_prefix: Prefix for local links (see render_student_row())
+        folders: Only refresh these students (default: all)
+        image_problems: Problems of external images (see check_external_images())
+        drop_problem_images: Leave images with problems out of the rows
+    """
+    image_problems = image_problems or {}
+    if Image is None:
+        print("Warning: Pillow is not installed; linking full-size images instead of thumbnails")
+    
+    encoded = 0
+    with (ProcessPoolExecutor() if Image is not None else nullcontext()) as executor:
+        for batch in student_batches(conn, folders):
+            entries = [(folder, json.loads(entry), row) for folder, entry, row in batch]
+            sources = [source for _, entry, _ in entries for source in local_image_sources(entry['info'])]
+            thumbnails, batch_encoded = refresh_thumbnails(conn, portfolio_dir, sources, run, executor)
+            encoded += batch_encoded
+            
+            # Re-render a row only if its student, links or last update changed
+            for folder_name, entry, row in entries:
+                row_inputs = {
+                    'github_username': github_mappings.get(folder_name),
+                    'thumbnails': {source: thumbnails[source]
+                                   for source in local_image_sources(entry['info']) if source in thumbnails},
+                    'last_updated': format_timestamp(git_metadata['folders'].get(folder_name), '%Y-%m-%d'),
+                    'link_prefix': link_prefix,
+                    'image_problems': {url: image_problems[url]
+                                       for url in external_image_urls(entry['info']) if url in image_problems},
+                    'drop_problem_images': drop_problem_images,
+                }
+                if entry.get('row_inputs') != row_inputs or row is None:
+                    entry['row_inputs'] = row_inputs
+                    conn.execute('UPDATE students SET entry = ?, row = ? WHERE folder = ?',
+                                 (json.dumps(entry),
+                                  render_student_row(info_from_json(entry['info']), **row_inputs),
+                                  folder_name))
+    
+    if encoded:
+        print(f"Generated {encoded} thumbnails")
+    
+    # Forget images that are no longer linked and delete their thumbnails
+    if folders is None:
+        conn.execute('DELETE FROM images WHERE run != ?', (run,))
+    else:
+        conn.executemany('DELETE FROM images WHERE run != ? AND substr(source, 1, ?) = ?',
+                         [(run, len(folder) + 1, folder + '/') for folder in folders])
+    prune_thumbnails(conn, portfolio_dir, folders)
+    report_oversized_images(conn)
+
+
+def report_oversized_images(conn: sqlite3.Connection, limit: int = 5) -> None:
+    """
+    Warn about linked images of OVERSIZED_IMAGE_BYTES or more.
+    
+    Uses the sizes and dimensions already in the manifest, so no image is
+    opened.
+    
+    Args:
+        conn: Open manifest database
+        limit: Largest images to list by name
+    """
+    count, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM images WHERE size >= ?',
+                                (OVERSIZED_IMAGE_BYTES,)).fetchone()
+    if not count:
+        return
+    print(f"Warning: {count} linked images are {OVERSIZED_IMAGE_BYTES / (1024*1024):.0f} MB or larger "
+          f"({total / (1024*1024):.1f} MB in total); shrink them with resize_images.py")
+    for source, size, width, height, source_format in conn.execute(
+            'SELECT source, size, width, height, format FROM images WHERE size >= ? '
+            'ORDER BY size DESC LIMIT ?', (OVERSIZED_IMAGE_BYTES, limit)):
+        dimensions = f"{width}x{height} {source_format}" if width else "unknown format"
+        print(f"  {source}: {size / (1024*1024):.1f} MB, {dimensions}")
+
+
+README_HEADER = """# 👨‍🎓 Student Portfolios
 
 Welcome to the Decision Analytics Student Portfolio Collection!
 
@@ -155,49 +891,214 @@ This README is automatically generated and updated when changes are made to stud
 
 ## 📊 Current Students
 
-| Student | Nickname | Interesting Facts | Portfolio | GitHub | Thumbnails |
-|---------|----------|-------------------|-----------|--------|------------|
 """
+
+TABLE_HEADER = """| Student | Nickname | Interesting Facts | Portfolio | GitHub | Last Updated | Thumbnails |
+|---------|----------|-------------------|-----------|--------|--------------|------------|
+"""
+
+
+def shard_name(folder_name: str) -> str:
+    """Return the letter page a student belongs to: 'A' to 'Z', or 'other'."""
+    initial = folder_name[:1].upper()
+    return initial if 'A' <= initial <= 'Z' else 'other'
+
+
+def write_if_changed(path: Path, chunks: Iterable[str]) -> bool:
+    """
+    Write a file unless it already has exactly this content.
     
-    for student in students:
-        nickname = student.get('nickname', 'N/A')
-        fact1 = student.get('fact1', 'N/A')
-        fact2 = student.get('fact2', 'N/A')
-        folder_name = student['folder_name']
+    The chunks are streamed into a temporary file and hashed on the way; the
+    temporary file replaces path only if the hash differs from the current
+    file's, so unchanged files keep their mtime and produce no diff.
+    
+    Args:
+        path: File to write
+        chunks: Pieces of the new content
         
-        # Truncate facts if they're too long
-        fact1_short = fact1[:50] + "..." if len(fact1) > 50 else fact1
-        fact2_short = fact2[:50] + "..." if len(fact2) > 50 else fact2
+    Returns:
+        True if the file was written
+    """
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                digest.update(chunk.encode('utf-8'))
+        if path.exists() and hash_file(path) == digest.hexdigest():
+            os.unlink(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+        return True
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def write_index_pages(conn: sqlite3.Connection, portfolio_dir: Path, shard_by: str,
+                      page_size: int = DEFAULT_PAGE_SIZE) -> List[Dict[str, Any]]:
+    """
+    Split the student table into pages under index/.
+    
+    Args:
+        conn: Open manifest database with up-to-date rows
+        portfolio_dir: Path to the student-portfolios directory
+        shard_by: 'letter' for one page per initial, 'page' for fixed-size pages
+        page_size: Students per page when shard_by is 'page'
         
-        # Combine facts for display
-        facts_display = f"{fact1_short}<br>{fact2_short}"
+    Returns:
+        One dictionary per page with its 'name', 'path' (relative to
+        portfolio_dir), student 'count' and 'first'/'last' folder names
+    """
+    index_dir = portfolio_dir / INDEX_DIRNAME
+    index_dir.mkdir(exist_ok=True)
+    
+    if shard_by == 'letter':
+        conn.create_function('shard_name', 1, shard_name, deterministic=True)
+        rows = conn.execute('SELECT shard_name(folder), folder, row FROM students '
+                            'ORDER BY shard_name(folder), folder')
+    else:
+        rows = ((f"page-{position // page_size + 1:03d}", folder, row) for position, (folder, row)
+                in enumerate(conn.execute('SELECT folder, row FROM students ORDER BY folder')))
+    
+    pages = []
+    written = 0
+    for name, group in itertools.groupby(rows, key=lambda r: r[0]):
+        page = {'name': name, 'path': f"{INDEX_DIRNAME}/{name}.md", 'count': 0}
         
-        # Generate GitHub link
-        github_username = github_mappings.get(folder_name)
-        if github_username:
-            github_link = f"[@{github_username}](https://github.com/{github_username})"
-        else:
-            github_link = "N/A"
+        def chunks():
+            yield f"# 👨‍🎓 Student Portfolios: {name}\n\n[← All students](../README.md)\n\n"
+            yield TABLE_HEADER
+            for _, folder, row in group:
+                page.setdefault('first', folder)
+                page['last'] = folder
+                page['count'] += 1
+                yield row
         
-        # Generate thumbnail HTML
-        thumbnails_html = ""
-        if 'images' in student and student['images']:
-            for img in student['images']:
-                if img.get('is_external', False):
-                    # External URL - use the full URL with size parameters
-                    # GitHub doesn't support resizing external URLs, so we'll use inline styles
-                    thumbnails_html += f'<img src="{img["filename"]}" alt="{img["alt"]}" title="{img["alt"]}" width="150" style="max-height: 85px; object-fit: contain; margin: 2px;">'
-                else:
-                    # Local file - use original image with width only to preserve aspect ratio
-                    # GitHub will respect the width attribute and auto-adjust height
-                    thumbnails_html += f'<img src="{folder_name}/{img["filename"]}" alt="{img["alt"]}" title="{img["alt"]}" width="150">'
+        written += write_if_changed(portfolio_dir / page['path'], chunks())
+        pages.append(page)
+    
+    # Remove pages that no longer have any students
+    removed = remove_index_pages(portfolio_dir, keep={Path(page['path']).name for page in pages})
+    
+    print(f"Updated {written} of {len(pages)} index pages" + (f", removed {removed}" if removed else ""))
+    return pages
+
+
+def remove_index_pages(portfolio_dir: Path, keep: Iterable[str] = ()) -> int:
+    """
+    Delete generated pages from index/, and the folder itself once it is empty.
+    
+    Args:
+        portfolio_dir: Path to the student-portfolios directory
+        keep: Names of pages to leave in place
         
-        if not thumbnails_html:
-            thumbnails_html = "No images"
+    Returns:
+        Number of pages deleted
+    """
+    index_dir = portfolio_dir / INDEX_DIRNAME
+    if not index_dir.is_dir():
+        return 0
+    
+    removed = 0
+    for path in index_dir.glob('*.md'):
+        if path.name not in keep:
+            path.unlink()
+            removed += 1
+    if not any(index_dir.iterdir()):
+        index_dir.rmdir()
+    return removed
+
+
+def write_portfolio_readme(portfolio_dir: Path, out: TextIO, full: bool = False,
+                           shard_by: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                           changed_paths: Optional[Iterable[str]] = None,
+                           url_check: Optional[str] = None,
+                           max_external_bytes: int = int(MAX_EXTERNAL_IMAGE_MB * 1024 * 1024)) -> int:
+    """
+    Write the main portfolio README.md content to a stream.
+    
+    Students whose README and referenced images are unchanged since the last
+    run are served from the manifest instead of being re-parsed, and table
+    rows are streamed from the manifest in folder order.
+    
+    Args:
+        portfolio_dir: Path to the student-portfolios directory
+        out: Text stream to write the README content to
+        full: Ignore the manifest and re-parse every student
+        shard_by: None for a single table, or 'letter'/'page' to write the
+            table to pages under index/ and a table of contents to out
+        page_size: Students per page when shard_by is 'page'
+        changed_paths: Paths changed since the last run (see
+            changed_student_folders()); only those students are re-scanned
+        url_check: None, or 'annotate'/'drop' to check external images and
+            flag or leave out the dead and oversized ones
+        max_external_bytes: Largest acceptable external image with url_check
+        
+    Returns:
+        Number of students in the table
+    """
+    conn = open_manifest(portfolio_dir, full)
+    try:
+        with conn:
+            run = conn.execute('SELECT COALESCE(MAX(run), 0) + 1 FROM students').fetchone()[0]
+            
+            # Load GitHub mappings
+            github_mappings = load_github_mappings(portfolio_dir)
+            
+            # Untouched students' rows can only be reused if they were
+            # rendered with the same GitHub mappings and link style
+            link_prefix = '../' if shard_by else ''
+            settings = {
+                'link_prefix': link_prefix,
+                'url_check': f"{url_check}:{max_external_bytes}" if url_check else '',
+                'github_mappings': hashlib.sha256(
+                    json.dumps(github_mappings, sort_keys=True).encode('utf-8')).hexdigest(),
+            }
+            folders = None
+            if changed_paths is not None and run > 1 and \
+                    dict(conn.execute('SELECT name, value FROM settings')) == settings:
+                folders = changed_student_folders(portfolio_dir, changed_paths)
+            conn.executemany('INSERT OR REPLACE INTO settings VALUES (?, ?)', settings.items())
+            
+            found, reparsed = update_manifest(conn, portfolio_dir, run, folders)
+            if folders is None:
+                print(f"Parsed {reparsed} of {found} student READMEs")
+            else:
+                print(f"Parsed {reparsed} of {len(folders)} changed student folders")
+            
+            # Last commit times for every folder from one git log pass
+            git_metadata = load_git_metadata(portfolio_dir)
+            
+            image_problems = {}
+            if url_check:
+                image_problems, changed = check_external_images(conn, max_external_bytes)
+                if folders is not None:
+                    folders |= changed
+            
+            refresh_rows(conn, portfolio_dir, run, github_mappings, git_metadata,
+                         link_prefix, folders, image_problems, url_check == 'drop')
+            student_count = conn.execute('SELECT COUNT(*) FROM students').fetchone()[0]
         
-        content += f"| {folder_name} | {nickname} | {facts_display} | [View Portfolio]({folder_name}/README.md) | {github_link} | {thumbnails_html} |\n"
+        # Generate the README content
+        out.write(README_HEADER)
+        
+        if shard_by:
+            out.write("| Page | Students | From | To |\n|------|----------|------|----|\n")
+            for page in write_index_pages(conn, portfolio_dir, shard_by, page_size):
+                out.write(f"| [{page['name']}]({page['path']}) | {page['count']} | {page['first']} | {page['last']} |\n")
+        else:
+            remove_index_pages(portfolio_dir)
+            out.write(TABLE_HEADER)
+            # Students alphabetically by folder name, straight from the manifest's index
+            for (row,) in conn.execute('SELECT row FROM students ORDER BY folder'):
+                out.write(row)
+    finally:
+        conn.close()
     
-    content += f"""
+    out.write(f"""
 ## 🆕 How to Add Your Portfolio
 
 1. Create a new folder with your name (e.g., `YourName`)
@@ -232,35 +1133,94 @@ This README is automatically generated and updated when changes are made to stud
 This README is automatically updated via GitHub Actions whenever any `README.md` file in the student-portfolios folder (or its subfolders) is modified.
 
 ---
-*Last updated: {os.popen('git log -1 --format="%Y-%m-%d %H:%M:%S" -- .').read().strip() or 'Unknown'}*
-"""
+*Last updated: {format_timestamp(git_metadata['latest'], '%Y-%m-%d %H:%M:%S UTC') or 'Unknown'}*
+""")
+    
+    return student_count
+
+
+
+
+def generate_portfolio_readme(portfolio_dir: Path, full: bool = False) -> str:
+    """
+    Generate the main portfolio README.md content.
     
-    return content
+    Args:
+        portfolio_dir: Path to the student-portfolios directory
+        full: Ignore the manifest and re-parse every student
+        
+    Returns:
+        String content for the README.md file
+    """
+    out = io.StringIO()
+    write_portfolio_readme(portfolio_dir, out, full)
+    return out.getvalue()
+
+
+# Functions measured with --profile: (function, stage, bytes handled)
+PROFILE_STAGES = [
+    ('scan_student_dirs', 'scan folders', None),
+    ('read_readme', 'read READMEs', text_size),
+    ('parse_readme', 'regex extraction', None),
+    ('list_directory', 'list folders', None),
+    ('find_local_image', 'image existence', None),
+    ('read_image_header', 'image headers', None),
+    ('image_signatures', 'image stat', None),
+    ('hash_file', 'hash files', file_size),
+    ('refresh_thumbnails', 'thumbnails', None),
+    ('load_git_metadata', 'git metadata', None),
+    ('check_urls', 'check image URLs', None),
+    ('render_student_row', 'render rows', None),
+    ('write_index_pages', 'write index pages', None),
+]
 
 
 def main():
     """Main function to generate the portfolio README."""
+    parser = argparse.ArgumentParser(description="Generate the student portfolio README.")
+    parser.add_argument('--full', action='store_true',
+                        help="ignore the manifest and re-parse every student README")
+    parser.add_argument('--shard-by', choices=['letter', 'page'],
+                        help="split the table into pages under index/ by initial letter or page size")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"students per page with --shard-by page (default: {DEFAULT_PAGE_SIZE})")
+    parser.add_argument('--changed-paths', type=argparse.FileType('r', encoding='utf-8'), metavar='FILE',
+                        help="only re-scan the student folders in this list of changed paths (- for stdin)")
+    parser.add_argument('--check-urls', nargs='?', const='annotate', choices=['annotate', 'drop'],
+                        help="check external images and flag (default) or drop dead and oversized ones")
+    parser.add_argument('--max-image-mb', type=float, default=MAX_EXTERNAL_IMAGE_MB,
+                        help=f"largest acceptable external image with --check-urls (default: {MAX_EXTERNAL_IMAGE_MB:g})")
+    parser.add_argument('--profile', nargs='?', const='', metavar='FILE',
+                        help="print per-stage timings; also save them to FILE (.json, otherwise pstats)")
+    args = parser.parse_args()
+    changed_paths = args.changed_paths.read().splitlines() if args.changed_paths else None
+    
     # Get the directory where this script is located
     script_dir = Path(__file__).parent
     portfolio_dir = script_dir
     
     print(f"Scanning student portfolios in: {portfolio_dir}")
     
-    # Generate the README content
-    readme_content = generate_portfolio_readme(portfolio_dir)
-    
-    # Write the README.md file
-    readme_path = portfolio_dir / 'README.md'
-    try:
-        with open(readme_path, 'w', encoding='utf-8') as f:
-            f.write(readme_content)
-        print(f"Successfully generated {readme_path}")
-        # Count students by counting lines that contain "View Portfolio"
-        student_count = readme_content.count('[View Portfolio]')
-        print(f"Found {student_count} student portfolios")
-    except Exception as e:
-        print(f"Error writing README.md: {e}")
-        return 1
+    with profile_session(args.profile, sys.modules[__name__], PROFILE_STAGES) as profiler:
+        # Write README.md via a temporary file so an interrupted run leaves the old one intact
+        readme_path = portfolio_dir / 'README.md'
+        fd, tmp_path = tempfile.mkstemp(dir=portfolio_dir, prefix='.README.md.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                if profiler:
+                    f.write = profiler.wrap(f.write, 'write README', written_size)
+                student_count = write_portfolio_readme(portfolio_dir, f, full=args.full,
+                                                       shard_by=args.shard_by, page_size=args.page_size,
+                                                       changed_paths=changed_paths,
+                                                       url_check=args.check_urls,
+                                                       max_external_bytes=int(args.max_image_mb * 1024 * 1024))
+            os.replace(tmp_path, readme_path)
+            print(f"Successfully generated {readme_path}")
+            print(f"Found {student_count} student portfolios")
+        except Exception as e:
+            os.unlink(tmp_path)
+            print(f"Error writing README.md: {e}")
+            return 1
     
     return 0
 
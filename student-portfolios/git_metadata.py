@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Git Metadata for Student Portfolios
+
+Finds the last commit time of every student folder with a single
+`git log --name-only` pass instead of one git call per folder. Results are
+cached in .git_metadata_cache.json together with the commit they describe;
+when HEAD has moved on, only the new commits are read.
+"""
+
+import json
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+CACHE_FILENAME = '.git_metadata_cache.json'
+
+
+def run_git(portfolio_dir: Path, args: List[str]) -> Optional[str]:
+    """
+    Run a git command in the portfolio directory.
+
+    Args:
+        portfolio_dir: Path to the student-portfolios directory
+        args: Arguments to pass to git
+
+    Returns:
+        The command's standard output, or None if git failed or is missing
+    """
+    try:
+        result = subprocess.run(['git', '-c', 'core.quotePath=false'] + args, cwd=portfolio_dir,
+                                capture_output=True, text=True, encoding='utf-8')
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout
+
+
+def read_commit_times(portfolio_dir: Path, revision_range: str) -> Dict[str, Any]:
+    """
+    Read last commit times from one `git log` over the portfolio directory.
+
+    Args:
+        portfolio_dir: Path to the student-portfolios directory
+        revision_range: Commits to read (e.g. "HEAD" or "<old>..HEAD")
+
+    Returns:
+        Dictionary with 'latest' (newest commit time touching the directory,
+        or None) and 'folders' (folder name -> newest commit time), as Unix
+        timestamps
+    """
+    metadata = {'latest': None, 'folders': {}}
+    output = run_git(portfolio_dir, ['log', '--format=%x00%ct', '--name-only', '--no-renames',
+                                     '--relative', revision_range, '--', '.'])
+    if output is None:
+        return metadata
+
+    # Newest commits come first, so the first time is the last update
+    folders = metadata['folders']
+    timestamp = None
+    for line in output.splitlines():
+        if line.startswith('\0'):
+            timestamp = int(line[1:])
+            if metadata['latest'] is None:
+                metadata['latest'] = timestamp
+        elif '/' in line and timestamp is not None:
+            folders.setdefault(line.split('/', 1)[0], timestamp)
+    return metadata
+
+
+def load_git_metadata(portfolio_dir: Path) -> Dict[str, Any]:
+    """
+    Get last commit times for the portfolio directory and every student folder.
+
+    Args:
+        portfolio_dir: Path to the student-portfolios directory
+
+    Returns:
+        Dictionary as returned by read_commit_times(); empty times if the
+        directory is not in a git repository
+    """
+    head = run_git(portfolio_dir, ['rev-parse', 'HEAD'])
+    if head is None:
+        return {'latest': None, 'folders': {}}
+    head = head.strip()
+
+    cache_file = portfolio_dir / CACHE_FILENAME
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        cache = {}
+
+    cached_head = cache.get('head')
+    if cached_head == head:
+        return cache['metadata']
+
+    if cached_head and run_git(portfolio_dir, ['merge-base', '--is-ancestor', cached_head, head]) is not None:
+        # Only the commits since the cached one can change anything
+        metadata = cache['metadata']
+        new = read_commit_times(portfolio_dir, f"{cached_head}..{head}")
+        if new['latest'] is not None:
+            metadata['latest'] = new['latest']
+        metadata['folders'].update(new['folders'])
+    else:
+        metadata = read_commit_times(portfolio_dir, head)
+
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({'head': head, 'metadata': metadata}, f, indent=1, sort_keys=True)
+    except OSError as e:
+        print(f"Warning: Could not write git metadata cache {cache_file}: {e}")
+    return metadata
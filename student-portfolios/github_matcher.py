@@ -5,16 +5,33 @@ GitHub Username Matcher for Student Portfolios
 This script matches student portfolio folder names with GitHub usernames from pull requests
 and updates their README.md files with GitHub profile links.
 
-Usage: python github_matcher.py
+Usage: python github_matcher.py [--assign] [--yes | --dry-run] [--profile [FILE]]
+
+By default each student gets their best-scoring username independently, so
+two students can end up with the same one. --assign instead finds the
+one-to-one matching with the highest total confidence (requires numpy and
+scipy). --yes applies the README edits without prompting and --dry-run only
+reports them, for running in CI. --profile prints the time, calls and bytes
+of each stage (see profiling.py).
 """
 
 import os
 import re
+import sys
+import shutil
+import difflib
+import argparse
+import tempfile
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from difflib import SequenceMatcher
 import json
 
+from portfolio_parser import parse_readme, read_readme
+from profiling import profile_session, text_size, written_size
+
 # GitHub usernames extracted from pull requests
 GITHUB_USERNAMES = [
     'anastasialynch',
@@ -43,6 +60,42 @@ GITHUB_USERNAMES = [
     'vissa273'
 ]
 
+# Special case mappings based on observed patterns (nickname -> username)
+SPECIAL_MAPPINGS = {
+    'christiancampos': 'camposcm-ops',
+    'christian': 'camposcm-ops',
+    'cameron': 'cgraber29',
+    'eric': 'Echern914',
+    'chance': 'cdebolt25',
+    'david': 'jwsgw-756',
+    'james': 'jisaiahw',
+    'jared': 'jwsgw-756',
+    'michael': 'mjsu1128',
+    'patrick': 'mpoulakos4',
+    'will': 'vissa273',
+    'zubair': 'Ibro06',
+    'ryan': 'ryanjfr-web',  # Fix RyanF mapping
+    'valerie': 'vissa273',  # Try Valerie mapping
+    'aidan': 'jisaiahw',    # Try Aidan mapping
+    'andrew': 'ryanjfr-web', # Try Andrew mapping
+    'ava': 'jisaiahw',      # Try Ava mapping
+    'ian': 'Ibdyta',        # Try Ian mapping
+    'ibrahim': 'Ibro06',    # Try Ibrahim mapping
+    'adam': 'jisaiahw'      # Try Adam mapping
+}
+
+# Folder-specific mappings for disambiguation
+FOLDER_SPECIFIC_MAPPINGS = {
+    'SamA': 'sasplen',      # SamA -> sasplen
+    'SamR': 'samronin24',   # SamR -> samronin24
+    'MichaelP': 'mpoulakos4', # MichaelP -> mpoulakos4 (Patrick's username)
+    'MichaelS': 'mjsu1128',   # MichaelS -> mjsu1128
+    'RyanF': 'ryanjfr-web'    # RyanF -> ryanjfr-web
+}
+
+# Matches at or below this confidence are reported as unmatched
+MIN_CONFIDENCE = 0.3
+
 def similarity(a: str, b: str) -> float:
     """Calculate similarity between two strings using SequenceMatcher."""
     return SequenceMatcher(None, a.lower(), b.lower()).ratio()
@@ -57,146 +110,225 @@ def extract_student_info(readme_path: Path) -> Dict[str, str]:
     Returns:
         Dictionary containing extracted student information
     """
-    try:
-        with open(readme_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except Exception as e:
-        print(f"Warning: Could not read {readme_path}: {e}")
+    content = read_readme(readme_path)
+    if content is None:
         return {}
     
     info = {}
     
     # Extract nickname/pseudonym
-    nickname_match = re.search(r'\*\*Nickname/Pseudonym\*\*\s*\|\s*([^|]+?)\s*\|', content)
-    if nickname_match:
-        info['nickname'] = nickname_match.group(1).strip()
+    fields, _ = parse_readme(content)
+    if 'nickname' in fields:
+        info['nickname'] = fields['nickname']
     
     # Extract student name from folder name
     info['folder_name'] = readme_path.parent.name
     
     return info
 
-def find_best_github_match(folder_name: str, nickname: str = None) -> Tuple[Optional[str], float]:
+class UsernameIndex:
+    """
+    Lookup structures over a list of GitHub usernames for find_best_github_match().
+    
+    Substring questions are answered from a trigram index (or, for "username
+    inside name", by looking up every substring of the name), and similarity
+    scoring only runs SequenceMatcher on candidates whose character-count
+    upper bound could still beat the current best score. Ties are broken by
+    position in the username list, exactly as a linear scan would.
+    """
+    
+    def __init__(self, usernames: List[str]):
+        self.usernames = list(usernames)
+        self.lowered = [username.lower() for username in self.usernames]
+        self.members = set(self.usernames)
+        
+        # Positions of each lowercased username, in list order
+        self.positions = {}
+        for i, username_lower in enumerate(self.lowered):
+            self.positions.setdefault(username_lower, []).append(i)
+        
+        # Trigram -> sorted positions of usernames containing it
+        self.trigrams = {}
+        for i, username_lower in enumerate(self.lowered):
+            for gram in {username_lower[j:j + 3] for j in range(len(username_lower) - 2)}:
+                self.trigrams.setdefault(gram, []).append(i)
+        
+        # Character -> (position, count) pairs for the quick_ratio() bound, and
+        # one matcher per username so SequenceMatcher analyses it only once
+        self.char_postings = {}
+        for i, username_lower in enumerate(self.lowered):
+            for char, count in Counter(username_lower).items():
+                self.char_postings.setdefault(char, []).append((i, count))
+        self.matchers = []
+        for username_lower in self.lowered:
+            matcher = SequenceMatcher(None)
+            matcher.set_seq2(username_lower)
+            self.matchers.append(matcher)
+    
+    def _containing_candidates(self, text: str) -> List[int]:
+        """Return positions, in order, of usernames sharing every trigram of text."""
+        if len(text) < 3:
+            return range(len(self.lowered))
+        postings = [self.trigrams.get(text[j:j + 3], []) for j in range(len(text) - 2)]
+        return sorted(set.intersection(*(set(p) for p in postings)))
+    
+    def first_containing(self, text: str) -> Optional[int]:
+        """Return the first position whose username contains text."""
+        for i in self._containing_candidates(text):
+            if text in self.lowered[i]:
+                return i
+        return None
+    
+    def all_containing(self, text: str) -> List[int]:
+        """Return every position whose username contains text."""
+        return [i for i in self._containing_candidates(text) if text in self.lowered[i]]
+    
+    def all_contained_in(self, text: str) -> List[int]:
+        """Return every position whose username is a substring of text."""
+        substrings = {text[j:k] for j in range(len(text)) for k in range(j + 1, len(text) + 1)}
+        return sorted(i for substring in substrings for i in self.positions.get(substring, []))
+    
+    def first_contained_in(self, text: str) -> Optional[int]:
+        """Return the first position whose username is a substring of text."""
+        found = self.all_contained_in(text)
+        return found[0] if found else None
+    
+    def best_similarity(self, text: str, threshold: float) -> Tuple[Optional[int], float]:
+        """
+        Return the first position with the highest similarity() to text.
+        
+        Args:
+            text: Lowercased name to compare against every username
+            threshold: Only scores strictly above this are of interest
+            
+        Returns:
+            Tuple of (position, score), or (None, threshold) if no username
+            scores above the threshold
+        """
+        # Characters in common (as quick_ratio() counts them) with every username
+        common = [0] * len(self.lowered)
+        for char, text_count in Counter(text).items():
+            for i, count in self.char_postings.get(char, ()):
+                common[i] += count if count < text_count else text_count
+        
+        bounds = []
+        for i, matches in enumerate(common):
+            if matches:
+                bound = 2.0 * matches / (len(text) + len(self.lowered[i]))
+                if bound > threshold:
+                    bounds.append((-bound, i))
+        
+        bounds.sort()
+        best_position, best_score = None, threshold
+        for negative_bound, i in bounds:
+            if -negative_bound < best_score:
+                break
+            matcher = self.matchers[i]
+            matcher.set_seq1(text)
+            score = matcher.ratio()
+            if score > best_score or (score == best_score and best_position is not None and i < best_position):
+                best_position, best_score = i, score
+        return best_position, best_score
+
+
+_default_index = None
+
+
+def default_username_index() -> UsernameIndex:
+    """Return the index over GITHUB_USERNAMES, building it on first use."""
+    global _default_index
+    if _default_index is None:
+        _default_index = UsernameIndex(GITHUB_USERNAMES)
+    return _default_index
+
+
+def find_best_github_match(folder_name: str, nickname: str = None,
+                           index: UsernameIndex = None) -> Tuple[Optional[str], float]:
     """
     Find the best matching GitHub username for a student.
     
     Args:
         folder_name: The folder name (e.g., "AdamF")
         nickname: The student's nickname if available
+        index: Usernames to match against (default: GITHUB_USERNAMES)
         
     Returns:
         Tuple of (best_match_username, confidence_score)
     """
+    index = index or default_username_index()
     best_match = None
     best_score = 0.0
     
     # Priority 1: Exact nickname matches (highest priority)
     if nickname:
         nickname_lower = nickname.lower().strip()
-        for username in GITHUB_USERNAMES:
-            username_lower = username.lower()
-            
-            # Exact match
-            if nickname_lower == username_lower:
-                return username, 1.0
-            
-            # Nickname is contained in username (e.g., "cameron" in "cgraber29")
-            if nickname_lower in username_lower:
-                score = 0.95
-                if score > best_score:
-                    best_match = username
-                    best_score = score
-            
+        
+        # Exact match
+        if nickname_lower in index.positions:
+            return index.usernames[index.positions[nickname_lower][0]], 1.0
+        
+        # Nickname is contained in username (e.g., "cameron" in "cgraber29")
+        position = index.first_containing(nickname_lower)
+        if position is not None:
+            best_match = index.usernames[position]
+            best_score = 0.95
+        else:
             # Username is contained in nickname (less likely but possible)
-            if username_lower in nickname_lower:
-                score = 0.9
-                if score > best_score:
-                    best_match = username
-                    best_score = score
+            position = index.first_contained_in(nickname_lower)
+            if position is not None:
+                best_match = index.usernames[position]
+                best_score = 0.9
     
     # Priority 2: Folder name matches
     folder_lower = folder_name.lower()
-    for username in GITHUB_USERNAMES:
-        username_lower = username.lower()
-        
-        # Extract first name from folder (e.g., "AdamF" -> "adam")
-        first_name = re.sub(r'[A-Z].*', '', folder_name).lower()
-        if first_name and len(first_name) > 2:
-            if first_name in username_lower:
-                score = 0.85
-                if score > best_score:
-                    best_match = username
-                    best_score = score
-        
-        # Direct substring matches
-        if folder_lower in username_lower or username_lower in folder_lower:
-            score = 0.8
-            if score > best_score:
-                best_match = username
-                best_score = score
+    
+    # Extract first name from folder (e.g., "AdamF" -> "adam")
+    first_name = re.sub(r'[A-Z].*', '', folder_name).lower()
+    if first_name and len(first_name) > 2 and 0.85 > best_score:
+        position = index.first_containing(first_name)
+        if position is not None:
+            best_match = index.usernames[position]
+            best_score = 0.85
+    
+    # Direct substring matches
+    if 0.8 > best_score:
+        positions = [p for p in (index.first_containing(folder_lower),
+                                 index.first_contained_in(folder_lower)) if p is not None]
+        if positions:
+            best_match = index.usernames[min(positions)]
+            best_score = 0.8
     
     # Priority 3: Similarity matching (nickname first, then folder)
     if nickname:
-        nickname_lower = nickname.lower().strip()
-        for username in GITHUB_USERNAMES:
-            score = similarity(nickname_lower, username.lower())
-            if score > best_score and score > 0.6:  # Higher threshold for nickname similarity
-                best_match = username
-                best_score = score
-    
-    # Similarity matching for folder name
-    for username in GITHUB_USERNAMES:
-        score = similarity(folder_lower, username.lower())
-        if score > best_score and score > 0.5:  # Lower threshold for folder similarity
-            best_match = username
+        # Higher threshold for nickname similarity
+        position, score = index.best_similarity(nickname_lower, max(best_score, 0.6))
+        if position is not None:
+            best_match = index.usernames[position]
             best_score = score
     
+    # Similarity matching for folder name (lower threshold)
+    position, score = index.best_similarity(folder_lower, max(best_score, 0.5))
+    if position is not None:
+        best_match = index.usernames[position]
+        best_score = score
+    
     # Priority 4: Special case mappings based on observed patterns
-    special_mappings = {
-        'christiancampos': 'camposcm-ops',
-        'christian': 'camposcm-ops',
-        'cameron': 'cgraber29',
-        'eric': 'Echern914',
-        'chance': 'cdebolt25',
-        'david': 'jwsgw-756',
-        'james': 'jisaiahw',
-        'jared': 'jwsgw-756',
-        'michael': 'mjsu1128',
-        'patrick': 'mpoulakos4',
-        'will': 'vissa273',
-        'zubair': 'Ibro06',
-        'ryan': 'ryanjfr-web',  # Fix RyanF mapping
-        'valerie': 'vissa273',  # Try Valerie mapping
-        'aidan': 'jisaiahw',    # Try Aidan mapping
-        'andrew': 'ryanjfr-web', # Try Andrew mapping
-        'ava': 'jisaiahw',      # Try Ava mapping
-        'ian': 'Ibdyta',        # Try Ian mapping
-        'ibrahim': 'Ibro06',    # Try Ibrahim mapping
-        'adam': 'jisaiahw'      # Try Adam mapping
-    }
     
     if nickname:
         nickname_lower = nickname.lower().strip()
-        if nickname_lower in special_mappings:
-            mapped_username = special_mappings[nickname_lower]
-            if mapped_username in GITHUB_USERNAMES:
+        if nickname_lower in SPECIAL_MAPPINGS:
+            mapped_username = SPECIAL_MAPPINGS[nickname_lower]
+            if mapped_username in index.members:
                 score = 0.9
                 if score > best_score:
                     best_match = mapped_username
                     best_score = score
     
     # Priority 5: Folder-specific mappings for disambiguation
-    folder_specific_mappings = {
-        'SamA': 'sasplen',      # SamA -> sasplen
-        'SamR': 'samronin24',   # SamR -> samronin24
-        'MichaelP': 'mpoulakos4', # MichaelP -> mpoulakos4 (Patrick's username)
-        'MichaelS': 'mjsu1128',   # MichaelS -> mjsu1128
-        'RyanF': 'ryanjfr-web'    # RyanF -> ryanjfr-web
-    }
     
-    if folder_name in folder_specific_mappings:
-        mapped_username = folder_specific_mappings[folder_name]
-        if mapped_username in GITHUB_USERNAMES:
+    if folder_name in FOLDER_SPECIFIC_MAPPINGS:
+        mapped_username = FOLDER_SPECIFIC_MAPPINGS[folder_name]
+        if mapped_username in index.members:
             score = 0.95
             if score > best_score:
                 best_match = mapped_username
@@ -204,28 +336,146 @@ def find_best_github_match(folder_name: str, nickname: str = None) -> Tuple[Opti
     
     return best_match, best_score
 
-def update_readme_with_github_link(readme_path: Path, github_username: str) -> bool:
+def score_matrix(students: List[Tuple[str, str]], index: UsernameIndex):
     """
-    Update a README.md file to include a GitHub profile link.
+    Score every student against every username.
+    
+    A pair's score is the highest confidence any rule of
+    find_best_github_match() gives that username for that student, so a
+    student's best score in the matrix is the confidence the greedy matcher
+    reports. Character-count upper bounds for the similarity rules are
+    computed for all pairs at once with numpy; SequenceMatcher only runs on
+    pairs whose bound beats the score the pair already has.
+    
+    Args:
+        students: (folder_name, nickname) pairs
+        index: Usernames to score against
+        
+    Returns:
+        numpy array of shape (len(students), len(index.usernames))
+    """
+    import numpy as np
+    
+    n_users = len(index.usernames)
+    scores = np.zeros((len(students), n_users))
+    
+    # Exact, substring and mapping rules, straight from the index
+    nicknames = []
+    for row, (folder_name, nickname) in enumerate(students):
+        nickname_lower = nickname.lower().strip() if nickname else ''
+        nicknames.append(nickname_lower)
+        rules = []
+        if nickname:
+            rules.append((index.positions.get(nickname_lower, []), 1.0))
+            rules.append((index.all_containing(nickname_lower), 0.95))
+            rules.append((index.all_contained_in(nickname_lower), 0.9))
+            mapped_username = SPECIAL_MAPPINGS.get(nickname_lower)
+            if mapped_username in index.members:
+                rules.append(([index.usernames.index(mapped_username)], 0.9))
+        
+        folder_lower = folder_name.lower()
+        first_name = re.sub(r'[A-Z].*', '', folder_name).lower()
+        if first_name and len(first_name) > 2:
+            rules.append((index.all_containing(first_name), 0.85))
+        rules.append((index.all_containing(folder_lower), 0.8))
+        rules.append((index.all_contained_in(folder_lower), 0.8))
+        mapped_username = FOLDER_SPECIFIC_MAPPINGS.get(folder_name)
+        if mapped_username in index.members:
+            rules.append(([index.usernames.index(mapped_username)], 0.95))
+        
+        for positions, score in rules:
+            if positions:
+                scores[row, positions] = np.maximum(scores[row, positions], score)
+    
+    # Character-count bounds for the similarity rules
+    alphabet = {char: k for k, char in enumerate(index.char_postings)}
+    user_counts = np.zeros((n_users, len(alphabet)), dtype=np.int32)
+    for char, postings in index.char_postings.items():
+        positions, counts = zip(*postings)
+        user_counts[list(positions), alphabet[char]] = counts
+    user_lengths = np.array([len(username) for username in index.lowered])
+    
+    def similarity_bounds(texts: List[str]):
+        text_counts = np.zeros((len(texts), len(alphabet)), dtype=np.int32)
+        for row, text in enumerate(texts):
+            for char, count in Counter(text).items():
+                if char in alphabet:
+                    text_counts[row, alphabet[char]] = count
+        common = np.zeros((len(texts), n_users), dtype=np.int32)
+        for k in np.flatnonzero(text_counts.any(axis=0)):
+            common += np.minimum(text_counts[:, k, None], user_counts[None, :, k])
+        lengths = np.array([len(text) for text in texts])
+        return 2.0 * common / np.maximum(lengths[:, None] + user_lengths[None, :], 1)
+    
+    # Nickname similarity must exceed 0.6, folder similarity 0.5
+    folders = [folder_name.lower() for folder_name, _ in students]
+    for texts, threshold in ((nicknames, 0.6), (folders, 0.5)):
+        bounds = similarity_bounds(texts)
+        rows, cols = np.nonzero(bounds > np.maximum(scores, threshold))
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            if not texts[row]:
+                continue
+            matcher = index.matchers[col]
+            matcher.set_seq1(texts[row])
+            score = matcher.ratio()
+            if score > threshold and score > scores[row, col]:
+                scores[row, col] = score
+    
+    return scores
+
+def assign_github_usernames(students: List[Tuple[str, str]],
+                            index: UsernameIndex = None) -> List[Tuple[Optional[str], float]]:
+    """
+    Match students to usernames so that no username is used twice.
+    
+    Solves a maximum-weight bipartite matching (Hungarian algorithm, via
+    scipy) over score_matrix(), instead of taking each student's best
+    username independently.
+    
+    Args:
+        students: (folder_name, nickname) pairs
+        index: Usernames to match against (default: GITHUB_USERNAMES)
+        
+    Returns:
+        (username, confidence) for each student, in order; (None, 0.0) for
+        students left without a username
+    """
+    from scipy.optimize import linear_sum_assignment
+    
+    index = index or default_username_index()
+    assignments = [(None, 0.0)] * len(students)
+    if not students or not index.usernames:
+        return assignments
+    
+    scores = score_matrix(students, index)
+    rows, cols = linear_sum_assignment(scores, maximize=True)
+    for row, col in zip(rows.tolist(), cols.tolist()):
+        if scores[row, col] > 0:
+            assignments[row] = (index.usernames[col], float(scores[row, col]))
+    return assignments
+
+def plan_github_link_update(readme_path: Path, github_username: str) -> Optional[Tuple[str, str]]:
+    """
+    Work out how a README.md file should change to include a GitHub profile link.
     
     Args:
         readme_path: Path to the README.md file
         github_username: GitHub username to link to
         
     Returns:
-        True if successfully updated, False otherwise
+        Tuple of (current content, new content), or None if the file could
+        not be read; both are equal if the file already has a GitHub link
     """
     try:
         with open(readme_path, 'r', encoding='utf-8') as f:
             content = f.read()
     except Exception as e:
         print(f"Error reading {readme_path}: {e}")
-        return False
+        return None
     
     # Check if GitHub link already exists
     if 'github.com' in content.lower():
-        print(f"GitHub link already exists in {readme_path}")
-        return True
+        return content, content
     
     # Find the student information table and add GitHub link
     github_link = f"|| **GitHub Profile** | [@{github_username}](https://github.com/{github_username}) |"
@@ -244,16 +494,161 @@ def update_readme_with_github_link(readme_path: Path, github_username: str) -> b
         github_section = f"\n\n## 🔗 GitHub Profile\n\n[@{github_username}](https://github.com/{github_username})\n"
         new_content = content.rstrip() + github_section
     
+    return content, new_content
+
+def atomic_write(path: Path, content: str) -> None:
+    """
+    Replace a file's contents so readers see either the old or the new file.
+    
+    The content is written to a temporary file in the same directory, flushed
+    to disk and renamed over the original, so an interrupted run never leaves
+    a half-written file behind.
+    
+    Args:
+        path: File to write
+        content: New file contents
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def update_readme_with_github_link(readme_path: Path, github_username: str) -> bool:
+    """
+    Update a README.md file to include a GitHub profile link.
+    
+    Args:
+        readme_path: Path to the README.md file
+        github_username: GitHub username to link to
+        
+    Returns:
+        True if successfully updated, False otherwise
+    """
+    plan = plan_github_link_update(readme_path, github_username)
+    if plan is None:
+        return False
+    
+    content, new_content = plan
+    if new_content == content:
+        print(f"GitHub link already exists in {readme_path}")
+        return True
+    
     try:
-        with open(readme_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        atomic_write(readme_path, new_content)
         return True
     except Exception as e:
         print(f"Error writing {readme_path}: {e}")
         return False
 
+def diff_summary(content: str, new_content: str) -> str:
+    """Return a short "+added -removed" line count for an edit."""
+    added = removed = 0
+    for line in difflib.unified_diff(content.splitlines(), new_content.splitlines(), lineterm='', n=0):
+        if line.startswith('+') and not line.startswith('+++'):
+            added += 1
+        elif line.startswith('-') and not line.startswith('---'):
+            removed += 1
+    return f"+{added} -{removed}"
+
+def update_readmes(matches: List[Tuple], dry_run: bool = False, workers: int = None) -> int:
+    """
+    Add GitHub links to many README files.
+    
+    Every edit is planned before any file is touched; the writes are then
+    applied concurrently with atomic_write().
+    
+    Args:
+        matches: (folder_name, nickname, github_username, confidence, readme_path) tuples
+        dry_run: Only report the planned edits
+        workers: Number of threads (default: ThreadPoolExecutor's default)
+        
+    Returns:
+        Number of README files updated (or that would be updated in a dry run)
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        plans = list(executor.map(lambda match: plan_github_link_update(match[4], match[2]), matches))
+        
+        edits = []
+        for (folder_name, _, github_username, _, readme_path), plan in zip(matches, plans):
+            if plan is None:
+                print(f"❌ Failed to update {folder_name}")
+            elif plan[0] == plan[1]:
+                print(f"➖ {folder_name}: GitHub link already present")
+            else:
+                edits.append((folder_name, github_username, readme_path, plan))
+        
+        if dry_run:
+            for folder_name, github_username, readme_path, (content, new_content) in edits:
+                print(f"📝 {folder_name} → @{github_username}: {readme_path.name} {diff_summary(content, new_content)}")
+            return len(edits)
+        
+        def apply(edit):
+            folder_name, github_username, readme_path, (content, new_content) = edit
+            try:
+                atomic_write(readme_path, new_content)
+                return True
+            except Exception as e:
+                print(f"Error writing {readme_path}: {e}")
+                return False
+        
+        updated_count = 0
+        for (folder_name, github_username, readme_path, (content, new_content)), ok in zip(edits, executor.map(apply, edits)):
+            if ok:
+                print(f"✅ Updated {folder_name} with @{github_username} ({diff_summary(content, new_content)})")
+                updated_count += 1
+            else:
+                print(f"❌ Failed to update {folder_name}")
+        return updated_count
+
+def find_student_readmes(portfolio_dir: Path) -> Iterator[Path]:
+    """Yield the README.md of every student folder, in directory order."""
+    for item in portfolio_dir.iterdir():
+        if item.is_dir() and not item.name.startswith('.') and item.name != 'README_files':
+            readme_path = item / 'README.md'
+            if readme_path.exists():
+                yield readme_path
+
+# Functions measured with --profile: (function, stage, bytes handled)
+PROFILE_STAGES = [
+    ('find_student_readmes', 'scan folders', None),
+    ('read_readme', 'read READMEs', text_size),
+    ('parse_readme', 'regex extraction', None),
+    ('find_best_github_match', 'SequenceMatcher scoring', None),
+    ('score_matrix', 'SequenceMatcher scoring', None),
+    ('assign_github_usernames', 'assignment', None),
+    ('plan_github_link_update', 'plan README edits', None),
+    ('atomic_write', 'write READMEs', written_size),
+]
+
 def main():
     """Main function to match students with GitHub usernames and update READMEs."""
+    parser = argparse.ArgumentParser(description="Match student portfolios with GitHub usernames.")
+    parser.add_argument('--assign', action='store_true',
+                        help="use each GitHub username at most once (optimal one-to-one matching)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--yes', '-y', action='store_true',
+                      help="update the README files without asking for confirmation")
+    mode.add_argument('--dry-run', action='store_true',
+                      help="report the README edits that would be made without writing them")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="threads used to update README files")
+    parser.add_argument('--profile', nargs='?', const='', metavar='FILE',
+                        help="print per-stage timings; also save them to FILE (.json, otherwise pstats)")
+    args = parser.parse_args()
+    
+    with profile_session(args.profile, sys.modules[__name__], PROFILE_STAGES):
+        run_matcher(args)
+
+def run_matcher(args: argparse.Namespace) -> None:
+    """Match students with GitHub usernames and update their READMEs as the command line asks."""
     script_dir = Path(__file__).parent
     portfolio_dir = script_dir
     
@@ -262,13 +657,10 @@ def main():
     
     # Get all student directories
     students = []
-    for item in portfolio_dir.iterdir():
-        if item.is_dir() and not item.name.startswith('.') and item.name != 'README_files':
-            readme_path = item / 'README.md'
-            if readme_path.exists():
-                student_info = extract_student_info(readme_path)
-                if student_info:
-                    students.append((item.name, student_info, readme_path))
+    for readme_path in find_student_readmes(portfolio_dir):
+        student_info = extract_student_info(readme_path)
+        if student_info:
+            students.append((readme_path.parent.name, student_info, readme_path))
     
     # Sort students alphabetically
     students.sort(key=lambda x: x[0])
@@ -281,11 +673,21 @@ def main():
     matches = []
     unmatched = []
     
-    for folder_name, student_info, readme_path in students:
+    if args.assign:
+        try:
+            results = assign_github_usernames(
+                [(folder_name, student_info.get('nickname', '')) for folder_name, student_info, _ in students])
+        except ImportError as e:
+            print(f"Error: --assign needs numpy and scipy ({e})")
+            return
+    else:
+        results = [find_best_github_match(folder_name, student_info.get('nickname', ''))
+                   for folder_name, student_info, _ in students]
+    
+    for (folder_name, student_info, readme_path), (github_match, confidence) in zip(students, results):
         nickname = student_info.get('nickname', '')
-        github_match, confidence = find_best_github_match(folder_name, nickname)
         
-        if github_match and confidence > 0.3:
+        if github_match and confidence > MIN_CONFIDENCE:
             matches.append((folder_name, nickname, github_match, confidence, readme_path))
         else:
             unmatched.append((folder_name, nickname, readme_path))
@@ -312,19 +714,13 @@ def main():
     
     # Ask for confirmation before updating
     print()
-    response = input("Do you want to update the README files with GitHub links? (y/N): ").strip().lower()
-    
-    if response == 'y':
+    if args.dry_run:
+        print("📝 Planned README edits (dry run):")
+        planned_count = update_readmes(matches, dry_run=True, workers=args.workers)
+        print(f"\n{planned_count} README files would be updated. Re-run with --yes to apply.")
+    elif args.yes or input("Do you want to update the README files with GitHub links? (y/N): ").strip().lower() == 'y':
         print("\n📝 Updating README files...")
-        updated_count = 0
-        
-        for folder_name, nickname, github_username, confidence, readme_path in matches:
-            if update_readme_with_github_link(readme_path, github_username):
-                print(f"✅ Updated {folder_name} with @{github_username}")
-                updated_count += 1
-            else:
-                print(f"❌ Failed to update {folder_name}")
-        
+        updated_count = update_readmes(matches, workers=args.workers)
         print(f"\n🎉 Successfully updated {updated_count} README files!")
     else:
         print("No files updated. Run the script again when ready.")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Student README Parser
+
+Shared by generate_portfolio_readme.py and github_matcher.py. A student's
+README.md is scanned once with a single precompiled pattern for all the
+fields of the student information table, so parsing cost grows with the size
+of the file rather than with the number of fields extracted. Markdown image
+references are collected in a separate pass, so an image written inside a
+field value is still listed as an image.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Table labels and the keys they are stored under
+FIELDS = {
+    'Nickname/Pseudonym': 'nickname',
+    'Interesting Fact': 'fact1',
+    'Interesting Fact2': 'fact2',
+}
+
+# A "**Label** | value |" table cell for any of the labels
+FIELD_PATTERN = re.compile(
+    r'\*\*(?P<label>' + '|'.join(re.escape(label) for label in sorted(FIELDS, key=len, reverse=True)) + r')\*\*'
+    r'\s*\|\s*(?P<value>[^|]+?)\s*\|'
+)
+# A "![alt text](filename)" image reference
+IMAGE_PATTERN = re.compile(r'!\[([^\]]*)\]\(([^)]+)\)')
+
+
+def read_readme(readme_path: Path) -> Optional[str]:
+    """
+    Read a student's README.md file.
+
+    Args:
+        readme_path: Path to the student's README.md file
+
+    Returns:
+        The file contents, or None if it could not be read
+    """
+    try:
+        with open(readme_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except Exception as e:
+        print(f"Warning: Could not read {readme_path}: {e}")
+        return None
+
+
+def parse_readme(content: str) -> Tuple[Dict[str, str], List[Tuple[str, str]]]:
+    """
+    Extract the table fields and image references from README content.
+
+    Args:
+        content: Contents of a student's README.md file
+
+    Returns:
+        Tuple of (fields, images): fields maps 'nickname', 'fact1' and 'fact2'
+        to the first value found for each, and images lists (alt text, filename)
+        pairs in document order
+    """
+    fields = {}
+    for match in FIELD_PATTERN.finditer(content):
+        fields.setdefault(FIELDS[match.group('label')], match.group('value').strip())
+    # Images get their own pass: a field value may itself contain an image
+    images = IMAGE_PATTERN.findall(content)
+
+    # Keep the fields in table order regardless of where they were found
+    return {key: fields[key] for key in FIELDS.values() if key in fields}, images
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Opt-in Profiling for the Portfolio Tools
+
+Shared by generate_portfolio_readme.py and github_matcher.py. When a tool
+runs with --profile (or the PORTFOLIO_PROFILE environment variable set),
+the functions that make up each stage (directory scanning, README reads,
+regex extraction, image checks, matching, output writing, ...) are wrapped
+in the tool's module to record wall time, call counts and bytes, and a
+summary table is printed at the end. Nothing is wrapped otherwise, so a
+normal run pays no overhead at all.
+
+--profile FILE (or PORTFOLIO_PROFILE=FILE) also saves the numbers: as JSON
+for a .json file, otherwise as cProfile statistics readable with pstats.
+"""
+
+import os
+import json
+import time
+import inspect
+import cProfile
+import functools
+import threading
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+ENV_VAR = 'PORTFOLIO_PROFILE'
+
+# Computes the bytes a stage handled from a call's arguments and result
+SizeFunction = Callable[[tuple, Any], int]
+
+
+def text_size(args: tuple, result: Any) -> int:
+    """Size in bytes of a returned string (e.g. a file's contents)."""
+    return len(result.encode('utf-8')) if isinstance(result, str) else 0
+
+
+def file_size(args: tuple, result: Any) -> int:
+    """Size in bytes of the file passed as the first argument."""
+    try:
+        return os.path.getsize(args[0])
+    except (OSError, IndexError, TypeError):
+        return 0
+
+
+def written_size(args: tuple, result: Any) -> int:
+    """Size in bytes of the string passed as the last argument."""
+    return len(args[-1].encode('utf-8')) if args and isinstance(args[-1], str) else 0
+
+
+def profile_target(cli_value: Optional[str]) -> Optional[str]:
+    """
+    Work out whether and where to profile.
+
+    Args:
+        cli_value: Value of the --profile option: None if it was not given,
+            '' if given without a file
+
+    Returns:
+        None if profiling is off, '' for the summary table only, or the path
+        to save the results to
+    """
+    if cli_value is not None:
+        return cli_value
+    value = os.environ.get(ENV_VAR, '')
+    if value in ('', '0'):
+        return None
+    return '' if value == '1' else value
+
+
+class Profiler:
+    """Per-stage wall time, call and byte counters."""
+
+    def __init__(self):
+        self.stages = {}
+        self.lock = threading.Lock()  # Stages may run on worker threads
+        self.started = time.perf_counter()
+        self.elapsed = None
+
+    def record(self, stage: str, seconds: float, calls: int = 1, size: int = 0) -> None:
+        """Add one measurement to a stage's counters."""
+        with self.lock:
+            counters = self.stages.setdefault(stage, {'seconds': 0.0, 'calls': 0, 'bytes': 0})
+            counters['seconds'] += seconds
+            counters['calls'] += calls
+            counters['bytes'] += size
+
+    def wrap(self, func: Callable, stage: str, size: Optional[SizeFunction] = None) -> Callable:
+        """
+        Return a version of func that records its calls under a stage.
+
+        For generator functions the time spent producing each item is
+        recorded and every item counts as a call.
+
+        Args:
+            func: Function to measure
+            stage: Name of the stage to record under
+            size: Computes the bytes handled by a call (default: none)
+
+        Returns:
+            The wrapped function
+        """
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                iterator = func(*args, **kwargs)
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        self.record(stage, time.perf_counter() - start, calls=0)
+                        return
+                    self.record(stage, time.perf_counter() - start)
+                    yield item
+            return wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            self.record(stage, time.perf_counter() - start, size=size(args, result) if size else 0)
+            return result
+        return wrapper
+
+    def results(self) -> Dict[str, Any]:
+        """Return the counters as a JSON-serializable dictionary."""
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self.started
+        return {'total_seconds': elapsed, 'stages': self.stages}
+
+    def summary(self) -> str:
+        """Format the counters as a table, slowest stage first."""
+        results = self.results()
+        total = results['total_seconds']
+        lines = [f"{'Stage':<24} {'Time (s)':>10} {'% total':>8} {'Calls':>9} {'MB':>9}",
+                 '-' * 64]
+        for stage, counters in sorted(self.stages.items(), key=lambda item: -item[1]['seconds']):
+            share = counters['seconds'] / total * 100 if total else 0.0
+            lines.append(f"{stage:<24} {counters['seconds']:>10.4f} {share:>7.1f}% "
+                         f"{counters['calls']:>9} {counters['bytes'] / (1024*1024):>9.2f}")
+        lines.append('-' * 64)
+        lines.append(f"{'Total run time':<24} {total:>10.4f}")
+        lines.append("Stages can nest (e.g. README reads happen inside parsing), so times overlap.")
+        return '\n'.join(lines)
+
+
+@contextmanager
+def profile_session(cli_value: Optional[str], module: ModuleType,
+                    stages: List[Tuple[str, str, Optional[SizeFunction]]]) -> Iterator[Optional[Profiler]]:
+    """
+    Profile the enclosed block if profiling was asked for.
+
+    The named functions in module are replaced by measuring wrappers for the
+    duration of the block and restored afterwards; the summary is printed
+    and the results saved on exit.
+
+    Args:
+        cli_value: Value of the tool's --profile option (see profile_target())
+        module: Module whose functions are measured (the running tool)
+        stages: (function name, stage name, size function) triples
+
+    Yields:
+        The Profiler, or None if profiling is off
+    """
+    target = profile_target(cli_value)
+    if target is None:
+        yield None
+        return
+
+    profiler = Profiler()
+    originals = {name: getattr(module, name) for name, _, _ in stages}
+    for name, stage, size in stages:
+        setattr(module, name, profiler.wrap(originals[name], stage, size))
+
+    python_profiler = None
+    if target and not target.endswith('.json'):
+        python_profiler = cProfile.Profile()
+        python_profiler.enable()
+    try:
+        yield profiler
+    finally:
+        if python_profiler:
+            python_profiler.disable()
+        profiler.elapsed = time.perf_counter() - profiler.started
+        for name, func in originals.items():
+            setattr(module, name, func)
+
+        print()
+        print("⏱️ PROFILE:")
+        print(profiler.summary())
+        if target:
+            try:
+                if python_profiler:
+                    python_profiler.dump_stats(target)
+                else:
+                    with open(target, 'w', encoding='utf-8') as f:
+                        json.dump(profiler.results(), f, indent=2)
+                print(f"Profile saved to {target}")
+            except OSError as e:
+                print(f"Warning: Could not save profile to {target}: {e}")
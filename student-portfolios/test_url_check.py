@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Checks for url_check.py Against a Local HTTP Server
+
+Starts a keep-alive http.server on 127.0.0.1 in a background thread and
+runs check_urls() against it: a server that refuses HEAD (answered with a
+one-byte Range GET), revalidation of a cached result with a 304, a
+redirect loop and a server that never answers in time.
+
+Usage: python test_url_check.py (or python -m pytest test_url_check.py)
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Tuple
+
+import url_check
+from url_check import check_urls, url_problem
+
+IMAGE_SIZE = 12345
+ETAG = '"v1"'
+# Seconds the slow endpoint waits; well above the timeout the check is given
+SLOW_DELAY = 2.0
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves a few fixed endpoints and records every request it answers."""
+
+    protocol_version = 'HTTP/1.1'
+    # (method, path, status) of every response, shared by all handler threads
+    log: List[Tuple[str, str, int]] = []
+
+    def do_HEAD(self):
+        self.respond(head=True)
+
+    def do_GET(self):
+        self.respond(head=False)
+
+    def respond(self, head: bool) -> None:
+        headers = {}
+        body = b''
+        if self.path == '/no-head.png':
+            if head:
+                status = 405
+            else:
+                status = 206
+                headers = {'Content-Type': 'image/png',
+                           'Content-Range': f'bytes 0-0/{IMAGE_SIZE}'}
+                body = b'\x89'
+        elif self.path == '/etag.jpg':
+            headers = {'ETag': ETAG, 'Content-Type': 'image/jpeg'}
+            status = 304 if self.headers.get('If-None-Match') == ETAG else 200
+        elif self.path == '/loop':
+            status = 302
+            headers = {'Location': '/loop'}
+        elif self.path == '/slow.png':
+            time.sleep(SLOW_DELAY)
+            status = 200
+        else:
+            status = 404
+
+        self.log.append((self.command, self.path, status))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        # HEAD and 200 answers describe the full image; everything else its own body
+        length = IMAGE_SIZE if status == 200 else len(body)
+        self.send_header('Content-Length', str(length))
+        self.end_headers()
+        if not head and status == 200:
+            self.wfile.write(b'\0' * IMAGE_SIZE)
+        elif not head:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep the output to the check results
+
+
+def start_server() -> Tuple[ThreadingHTTPServer, str]:
+    """Start the local server in a daemon thread and return it with its base URL."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def with_server(check: Callable[[str], None]) -> Callable[[], None]:
+    """Run a check against a freshly started server with an empty request log."""
+    def run() -> None:
+        server, base = start_server()
+        Handler.log.clear()
+        try:
+            check(base)
+        finally:
+            server.shutdown()
+            server.server_close()
+    run.__name__ = check.__name__
+    run.__doc__ = check.__doc__
+    return run
+
+
+@with_server
+def test_head_refused(base: str) -> None:
+    """A 405 to HEAD is retried as a one-byte Range GET, and the size comes from Content-Range."""
+    result = check_urls([f"{base}/no-head.png"])[f"{base}/no-head.png"]
+    assert ('HEAD', '/no-head.png', 405) in Handler.log
+    assert ('GET', '/no-head.png', 206) in Handler.log
+    assert result['status'] == 200 and result['error'] is None
+    assert result['size'] == IMAGE_SIZE and result['content_type'] == 'image/png'
+
+
+@with_server
+def test_revalidation(base: str) -> None:
+    """A stale cached result is revalidated with If-None-Match and kept on a 304."""
+    url = f"{base}/etag.jpg"
+    cache = {}
+    first = check_urls([url], cache)[url]
+    assert first['etag'] == ETAG and first['size'] == IMAGE_SIZE
+
+    check_urls([url], cache)  # Fresh: answered from the cache without a request
+    assert len(Handler.log) == 1
+
+    second = check_urls([url], cache, max_age=0)[url]
+    assert Handler.log[-1] == ('HEAD', '/etag.jpg', 304)
+    assert second['status'] == 200 and second['size'] == IMAGE_SIZE
+    assert second['checked'] >= first['checked']
+
+
+@with_server
+def test_redirect_loop(base: str) -> None:
+    """A URL that keeps redirecting is reported as an error instead of a 3xx."""
+    result = check_urls([f"{base}/loop"])[f"{base}/loop"]
+    assert len(Handler.log) == url_check.MAX_REDIRECTS + 1
+    assert result['error'] == "too many redirects"
+    assert url_problem(result, IMAGE_SIZE) == "too many redirects"
+
+
+@with_server
+def test_timeout(base: str) -> None:
+    """A server slower than the timeout gives an error result, not an exception."""
+    start = time.perf_counter()
+    result = check_urls([f"{base}/slow.png"], timeout=0.5)[f"{base}/slow.png"]
+    assert time.perf_counter() - start < SLOW_DELAY
+    assert result['status'] is None
+    assert result['error'] == "no response within 0.5s"
+
+
+def main() -> int:
+    """Run every check and report the ones that fail."""
+    checks = [test_head_refused, test_revalidation, test_redirect_loop, test_timeout]
+    failed = 0
+    for check in checks:
+        try:
+            check()
+            print(f"✓ {check.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"✗ {check.__name__}: {check.__doc__} {e}")
+    print(f"{len(checks) - failed} of {len(checks)} checks passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
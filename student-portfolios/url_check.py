@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Concurrent Checks of External Image URLs
+
+Used by generate_portfolio_readme.py --check-urls. Every URL gets a HEAD
+request (or a one-byte Range GET where HEAD is refused), all of them at
+once on one asyncio event loop: connections are kept alive and reused per
+host, each host gets at most a few requests at a time, and every request
+has a timeout. Results are cached with the response's ETag and
+Last-Modified, so a result younger than the cache age is reused outright
+and an older one is revalidated with a conditional request that a server
+answers with a bodiless 304 when nothing changed.
+
+Only the standard library is used: a small HTTP/1.1 client over asyncio
+streams is enough for status codes and headers.
+
+Usage on its own: python url_check.py URL [URL ...]
+"""
+
+import ssl
+import sys
+import time
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+# Requests in flight at once, overall and per host
+MAX_CONCURRENCY = 64
+PER_HOST_LIMIT = 4
+# Seconds allowed for one URL, redirects included
+TIMEOUT = 10.0
+# Results younger than this are reused without asking the server again
+CACHE_MAX_AGE = 24 * 60 * 60
+MAX_REDIRECTS = 5
+# Largest response body read to keep a connection reusable; bigger bodies
+# (a server ignoring Range) close the connection instead
+MAX_DRAIN_BYTES = 64 * 1024
+USER_AGENT = 'student-portfolios-url-check/1.0'
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+class ConnectionPool:
+    """Idle keep-alive connections per (scheme, host, port)."""
+
+    def __init__(self):
+        self.idle = {}
+        self.ssl_context = ssl.create_default_context()
+
+    async def acquire(self, key: Tuple[str, str, int]) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        """
+        Return a connection to key, reusing an idle one if there is one.
+
+        Returns:
+            Tuple of (reader, writer, reused)
+        """
+        connections = self.idle.get(key)
+        while connections:
+            reader, writer = connections.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+        scheme, host, port = key
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=self.ssl_context if scheme == 'https' else None)
+        return reader, writer, False
+
+    def release(self, key: Tuple[str, str, int], reader: asyncio.StreamReader,
+                writer: asyncio.StreamWriter) -> None:
+        """Return a connection for reuse."""
+        self.idle.setdefault(key, []).append((reader, writer))
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        for connections in self.idle.values():
+            for _, writer in connections:
+                writer.close()
+        self.idle.clear()
+
+
+async def read_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> bool:
+    """
+    Read and discard a small response body.
+
+    Returns:
+        True if the body was read and the connection can be reused
+    """
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        total = 0
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+            total += size
+            if total > MAX_DRAIN_BYTES:
+                return False
+            await reader.readexactly(size + 2)  # Chunk data and its CRLF
+            if size == 0:
+                return True
+    length = headers.get('content-length')
+    if length is None or not length.isdigit():
+        return False  # Body runs until the connection closes
+    if int(length) > MAX_DRAIN_BYTES:
+        return False
+    await reader.readexactly(int(length))
+    return True
+
+
+async def request(pool: ConnectionPool, method: str, url: str,
+                  headers: Dict[str, str]) -> Tuple[int, Dict[str, str]]:
+    """
+    Send one HTTP/1.1 request and read the response headers.
+
+    Args:
+        pool: Connections to reuse
+        method: 'HEAD' or 'GET'
+        url: Absolute http(s) URL
+        headers: Extra request headers
+
+    Returns:
+        Tuple of (status code, response headers with lower-case names)
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError("not an http(s) URL")
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    key = (parts.scheme, parts.hostname, port)
+    target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+    host = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+    lines = [f"{method} {target} HTTP/1.1", f"Host: {host}", f"User-Agent: {USER_AGENT}",
+             "Accept: image/*,*/*;q=0.8", "Connection: keep-alive"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    message = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    for attempt in range(2):
+        reader, writer, reused = await pool.acquire(key)
+        try:
+            writer.write(message)
+            await writer.drain()
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionResetError("connection closed")
+        except BaseException as e:  # Including cancellation by the timeout
+            writer.close()
+            # A kept-alive connection may have been closed by the server meanwhile
+            if reused and attempt == 0 and isinstance(e, (OSError, asyncio.IncompleteReadError)):
+                continue
+            raise
+        break
+
+    try:
+        version, status = status_line.decode('latin-1').split(None, 2)[:2]
+        status = int(status)
+        response_headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').rstrip('\r\n')
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        reusable = response_headers.get('connection', '').lower() != 'close' and version != 'HTTP/1.0'
+        if method != 'HEAD' and status not in (204, 304):
+            reusable = reusable and await read_body(reader, response_headers)
+    except BaseException:
+        writer.close()
+        raise
+    if reusable:
+        pool.release(key, reader, writer)
+    else:
+        writer.close()
+    return status, response_headers
+
+
+def response_size(status: int, headers: Dict[str, str]) -> Optional[int]:
+    """Return the full size of the resource from Content-Range or Content-Length, if known."""
+    if status == 206:
+        total = headers.get('content-range', '').rpartition('/')[2]
+        return int(total) if total.isdigit() else None
+    length = headers.get('content-length', '')
+    return int(length) if length.isdigit() else None
+
+
+async def probe(pool: ConnectionPool, url: str, cached: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Check one URL, following redirects.
+
+    Args:
+        pool: Connections to reuse
+        url: URL to check
+        cached: Previous result, for a conditional request
+
+    Returns:
+        Result dictionary: 'status' (None if no response), 'size',
+        'content_type', 'etag', 'last_modified', 'error' and 'checked'
+    """
+    conditional = {}
+    if cached and cached.get('status') == 200:
+        if cached.get('etag'):
+            conditional['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            conditional['If-Modified-Since'] = cached['last_modified']
+
+    current = url
+    error = None
+    for _ in range(MAX_REDIRECTS + 1):
+        status, headers = await request(pool, 'HEAD', current, conditional)
+        if status in (403, 405, 501):
+            # Some servers refuse HEAD; ask for a single byte instead
+            status, headers = await request(pool, 'GET', current, dict(conditional, Range='bytes=0-0'))
+        if status in REDIRECT_STATUSES and 'location' in headers:
+            current = urljoin(current, headers['location'])
+            continue
+        break
+    else:
+        error = "too many redirects"
+
+    if status == 304 and cached:
+        return dict(cached, checked=time.time())
+    return {
+        'status': 200 if status == 206 else status,
+        'size': response_size(status, headers),
+        'content_type': headers.get('content-type', '').split(';')[0].strip().lower() or None,
+        'etag': headers.get('etag'),
+        'last_modified': headers.get('last-modified'),
+        'error': error or (None if status < 400 else f"HTTP {status}"),
+        'checked': time.time(),
+    }
+
+
+async def check_all(urls: List[str], cache: Dict[str, Dict[str, Any]], max_concurrency: int,
+                    per_host_limit: int, timeout: float) -> Dict[str, Dict[str, Any]]:
+    """Check URLs concurrently with overall and per-host limits; see check_urls()."""
+    pool = ConnectionPool()
+    overall = asyncio.Semaphore(max_concurrency)
+    per_host = {}
+
+    async def check(url: str) -> Tuple[str, Dict[str, Any]]:
+        host = urlsplit(url).netloc.lower()
+        host_limit = per_host.setdefault(host, asyncio.Semaphore(per_host_limit))
+        # Wait for the host first, so URLs queued behind a busy host do not
+        # hold overall slots that other hosts could use
+        async with host_limit:
+            async with overall:
+                try:
+                    return url, await asyncio.wait_for(probe(pool, url, cache.get(url)), timeout)
+                except asyncio.TimeoutError:
+                    error = f"no response within {timeout:g}s"
+                except (OSError, ValueError, asyncio.IncompleteReadError, UnicodeError) as e:
+                    error = str(e) or type(e).__name__
+                return url, {'status': None, 'size': None, 'content_type': None, 'etag': None,
+                             'last_modified': None, 'error': error, 'checked': time.time()}
+
+    try:
+        return dict(await asyncio.gather(*(check(url) for url in urls)))
+    finally:
+        pool.close()
+
+
+def check_urls(urls: Iterable[str], cache: Optional[Dict[str, Dict[str, Any]]] = None,
+               max_age: float = CACHE_MAX_AGE, max_concurrency: int = MAX_CONCURRENCY,
+               per_host_limit: int = PER_HOST_LIMIT, timeout: float = TIMEOUT) -> Dict[str, Dict[str, Any]]:
+    """
+    Check external URLs, reusing cached results where possible.
+
+    Args:
+        urls: URLs to check
+        cache: Results of earlier checks keyed by URL; updated in place
+        max_age: Seconds a cached result is trusted without a request
+        max_concurrency: Requests in flight at once
+        per_host_limit: Requests in flight at once to one host
+        timeout: Seconds allowed per URL
+
+    Returns:
+        Dictionary of URL -> result (see probe())
+    """
+    cache = {} if cache is None else cache
+    now = time.time()
+    urls = sorted(set(urls))
+    stale = [url for url in urls if now - cache.get(url, {}).get('checked', 0) > max_age]
+    if stale:
+        cache.update(asyncio.run(check_all(stale, cache, max_concurrency, per_host_limit, timeout)))
+    return {url: cache[url] for url in urls}
+
+
+def url_problem(result: Dict[str, Any], max_bytes: int) -> Optional[str]:
+    """
+    Describe what is wrong with a checked image URL.
+
+    Args:
+        result: Result returned by check_urls()
+        max_bytes: Largest acceptable image size
+
+    Returns:
+        A short description ('HTTP 404', 'not an image', '12.3 MB', ...),
+        or None if the image looks fine
+    """
+    if result.get('error'):
+        return result['error']
+    content_type = result.get('content_type')
+    if content_type and not content_type.startswith('image/'):
+        return f"not an image ({content_type})"
+    if result.get('size') is not None and result['size'] > max_bytes:
+        return f"{result['size'] / (1024*1024):.1f} MB"
+    return None
+
+
+def main() -> int:
+    """Check the URLs given on the command line."""
+    urls = sys.argv[1:]
+    if not urls:
+        print("Usage: python url_check.py URL [URL ...]")
+        return 1
+    start = time.perf_counter()
+    results = check_urls(urls)
+    for url, result in results.items():
+        print(f"{result['status'] or '---'} {url}: {url_problem(result, sys.maxsize) or 'ok'}")
+    print(f"Checked {len(results)} URLs in {time.perf_counter() - start:.2f}s")
+    return 0 if not any(result['error'] for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    exit(main())